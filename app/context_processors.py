@@ -1,23 +1,15 @@
-from .models import Store
+from .services.store_registry import get_store_registry
 
 def user_store(request):
     if request.user.is_authenticated:
-        # Get all stores for this user
-        stores = Store.objects.filter(owner=request.user).order_by("id")
+        # Shared with the views through the request-scoped registry;
+        # nothing is queried unless a template reads these.
+        registry = get_store_registry(request)
 
-        # Try active store from session
-        active_store_id = request.session.get("active_store_id")
-        active_store = None
-        if active_store_id:
-            active_store = stores.filter(id=active_store_id).first()
-
-        # Fallback to first store if no active store
-        if not active_store:
-            active_store = stores.first()
-            if active_store:
-                request.session["active_store_id"] = active_store.id
-
-        return {'active_store': active_store, 'user_stores': stores}
+        return {
+            'active_store': lambda: registry.active_store,
+            'user_stores': lambda: registry.stores,
+        }
 
     return {'active_store': None, 'user_stores': []}
 from django.urls import resolve
@@ -31,17 +23,31 @@ from app.models import Cart
 from .models import Cart
 
 def cart(request):
-
-    if not request.session.session_key:
-        request.session.create()
-
-    session_key = request.session.session_key
-
-    cart, created = Cart.objects.get_or_create(
-        customer_session=session_key
-    )
+    """
+    Lazy cart context.
+
+    Templates only trigger a lookup when they actually read `cart`
+    or `cart_count` (Django calls callables on access). No session
+    or Cart row is created here — that only happens on the first
+    add-to-cart. The item count is kept in the session by the cart
+    views, so `cart_count` never hits the Cart tables.
+    """
+    loaded = {}
+
+    def get_cart():
+        if "cart" not in loaded:
+            session_key = request.session.session_key
+            loaded["cart"] = (
+                Cart.objects.filter(customer_session=session_key).first()
+                if session_key
+                else None
+            )
+        return loaded["cart"]
+
+    def get_cart_count():
+        return request.session.get("cart_count", 0)
 
     return {
-        "cart": cart,
-        "cart_count": cart.items.count(),
-    }
\ No newline at end of file
+        "cart": get_cart,
+        "cart_count": get_cart_count,
+    }
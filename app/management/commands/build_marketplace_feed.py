@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from app.services.feed import refresh_feed
+
+
+class Command(BaseCommand):
+
+    help = "Re-materialize the marketplace fair-mix candidate ids"
+
+    def handle(self, *args, **kwargs):
+
+        total = refresh_feed()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Marketplace feed rebuilt with {total} items"
+            )
+        )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from app.models import Item
+from app.services.categorizer import categorize_items
+
+
+class Command(BaseCommand):
+
+    help = "Backfill ItemCategory rows from CATEGORY_KEYWORDS"
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500
+        )
+
+    def handle(self, *args, **kwargs):
+
+        batch_size = kwargs["batch_size"]
+        last_id = 0
+        added = removed = 0
+
+        while True:
+
+            batch = list(
+                Item.objects
+                .filter(id__gt=last_id)
+                .only("id", "name", "description")
+                .order_by("id")[:batch_size]
+            )
+
+            if not batch:
+                break
+
+            a, r = categorize_items(batch)
+            added += a
+            removed += r
+            last_id = batch[-1].id
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Categories updated: {added} added, {removed} removed"
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from app.services.counters import flush
+
+
+class Command(BaseCommand):
+
+    help = "Write buffered store view/order counts to the database"
+
+    def handle(self, *args, **kwargs):
+
+        updated = flush()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated counters on {updated} stores"
+            )
+        )
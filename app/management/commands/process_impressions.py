@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from app.services.impressions import process_impressions
+
+
+class Command(BaseCommand):
+
+    help = "Aggregate storefront impressions into Item.views and ItemView"
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000
+        )
+
+    def handle(self, *args, **kwargs):
+
+        total = 0
+
+        while True:
+
+            count = process_impressions(
+                batch_size=kwargs["batch_size"]
+            )
+
+            total += count
+
+            if count < kwargs["batch_size"]:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {total} impressions"
+            )
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from app.services.paystack_events import process_events
+
+
+class Command(BaseCommand):
+
+    help = "Apply stored Paystack webhook events (orders and subscriptions)"
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50
+        )
+
+    def handle(self, *args, **kwargs):
+
+        claimed = processed = 0
+
+        while True:
+
+            count, ok = process_events(
+                batch_size=kwargs["batch_size"]
+            )
+
+            claimed += count
+            processed += ok
+
+            if count < kwargs["batch_size"]:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} of {claimed} Paystack events"
+            )
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from app.services.uploads import process_uploads
+
+
+class Command(BaseCommand):
+
+    help = "Upload queued product images to ImgBB (with retries)"
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20
+        )
+
+    def handle(self, *args, **kwargs):
+
+        claimed = succeeded = 0
+
+        while True:
+
+            count, ok = process_uploads(
+                batch_size=kwargs["batch_size"]
+            )
+
+            claimed += count
+            succeeded += ok
+
+            if count < kwargs["batch_size"]:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Uploaded {succeeded} of {claimed} queued images"
+            )
+        )
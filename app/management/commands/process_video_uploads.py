@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from app.services.video_uploads import expire_abandoned, process_video_uploads
+
+
+class Command(BaseCommand):
+
+    help = "Send fully received product videos to YouTube (with retries)"
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5
+        )
+
+    def handle(self, *args, **kwargs):
+
+        claimed = succeeded = 0
+
+        while True:
+
+            count, ok = process_video_uploads(
+                batch_size=kwargs["batch_size"]
+            )
+
+            claimed += count
+            succeeded += ok
+
+            if count < kwargs["batch_size"]:
+                break
+
+        expired = expire_abandoned()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Uploaded {succeeded} of {claimed} queued videos, "
+                f"removed {expired} abandoned uploads"
+            )
+        )
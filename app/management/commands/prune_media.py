@@ -0,0 +1,84 @@
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from app.storage import CAS_PREFIX
+
+
+class Command(BaseCommand):
+
+    help = "Delete content-addressed media files no row references any more"
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--min-age-hours",
+            type=int,
+            default=24,
+            help="Keep files younger than this (uploads still in flight)"
+        )
+
+        parser.add_argument(
+            "--dry-run",
+            action="store_true"
+        )
+
+    def referenced_names(self):
+        names = set()
+
+        for model in apps.get_models():
+            file_fields = [
+                f.name for f in model._meta.get_fields()
+                if isinstance(f, models.FileField)
+            ]
+            json_fields = [
+                f.name for f in model._meta.get_fields()
+                if f.name == "image_variants"
+            ]
+
+            if not file_fields and not json_fields:
+                continue
+
+            for row in model.objects.values_list(*file_fields, *json_fields):
+                for value in row[:len(file_fields)]:
+                    if value:
+                        names.add(value)
+
+                # Variant files are referenced by URL
+                for variants in row[len(file_fields):]:
+                    for url in (variants or {}).values():
+                        if url and url.startswith(settings.MEDIA_URL):
+                            names.add(url[len(settings.MEDIA_URL):])
+
+        return names
+
+    def handle(self, *args, **kwargs):
+
+        referenced = self.referenced_names()
+        cutoff = time.time() - kwargs["min_age_hours"] * 3600
+        root = default_storage.path(CAS_PREFIX)
+
+        removed = 0
+
+        for directory, _dirs, files in os.walk(root):
+            for filename in files:
+                full_path = os.path.join(directory, filename)
+                name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, "/")
+
+                if name in referenced or os.path.getmtime(full_path) > cutoff:
+                    continue
+
+                if not kwargs["dry_run"]:
+                    os.remove(full_path)
+                removed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Would remove' if kwargs['dry_run'] else 'Removed'} {removed} unreferenced files"
+            )
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from app.services.banks import refresh_banks
+
+
+class Command(BaseCommand):
+
+    help = "Refresh the local copy of Paystack's bank list"
+
+    def handle(self, *args, **kwargs):
+
+        count = refresh_banks()
+
+        if count is None:
+            self.stdout.write(
+                self.style.ERROR(
+                    "Paystack bank list unavailable, kept the current list"
+                )
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed {count} banks"
+            )
+        )
@@ -1,5 +1,6 @@
 from django.conf import settings
-from .models import Store
+from .services.store_cache import get_store_by_slug, get_store_by_id
+from .services.domain_index import get_store_id_for_host
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,29 @@ class StoreSubdomainMiddleware:
         # -----------------------------
         host = request.get_host().split(":")[0].lower()
 
+        # -----------------------------
+        # Custom domains (premium)
+        # -----------------------------
+        # In-memory host index, no query per request.
+        if (
+            host not in ["127.0.0.1", "localhost"]
+            and host != "waapfolio.com"
+            and not host.endswith(".waapfolio.com")
+            and not host.endswith(".localhost")
+        ):
+
+            store_id = get_store_id_for_host(host)
+
+            if store_id:
+
+                request.store = get_store_by_id(store_id)
+
+                if request.store is None:
+                    from django.http import Http404
+                    raise Http404("Store does not exist.")
+
+                return self.get_response(request)
+
         # -----------------------------
         # Development
         # -----------------------------
@@ -56,10 +80,9 @@ class StoreSubdomainMiddleware:
 
                 subdomain = host.split(".")[0]
 
-                try:
-                    request.store = Store.objects.get(slug=subdomain)
+                request.store = get_store_by_slug(subdomain)
 
-                except Store.DoesNotExist:
+                if request.store is None:
                     logger.warning(
                         f"Store '{subdomain}' not found."
                     )
@@ -86,13 +109,11 @@ class StoreSubdomainMiddleware:
 
         subdomain = parts[0]
 
-        try:
-
-            request.store = Store.objects.get(
-                slug=subdomain
-            )
+        # Cached (hits and misses), so storefront hits and bot scans
+        # of random subdomains don't each cost a MySQL round trip.
+        request.store = get_store_by_slug(subdomain)
 
-        except Store.DoesNotExist:
+        if request.store is None:
 
             logger.warning(
                 f"Store '{subdomain}' not found."
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:26
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_like_count(apps, schema_editor):
+    Item = apps.get_model("app", "Item")
+
+    counts = (
+        Item.objects
+        .annotate(n=Count("likes"))
+        .filter(n__gt=0)
+        .values_list("id", "n")
+    )
+
+    for item_id, n in counts:
+        Item.objects.filter(id=item_id).update(like_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0033_storeimpression'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_like_count, migrations.RunPython.noop),
+    ]
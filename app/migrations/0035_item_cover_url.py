@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:28
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_cover_url(apps, schema_editor):
+    # Items with a remote image resolve for free; the rest are left
+    # NULL and resolved in bulk the first time a grid shows them.
+    Item = apps.get_model("app", "Item")
+
+    Item.objects.exclude(
+        image_url__isnull=True
+    ).exclude(
+        image_url=""
+    ).update(cover_url=F("image_url"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0034_item_like_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='cover_url',
+            field=models.CharField(blank=True, editable=False, max_length=500, null=True),
+        ),
+        migrations.RunPython(backfill_cover_url, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0035_item_cover_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(db_index=True, max_length=30)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='categories', to='app.item')),
+            ],
+            options={
+                'unique_together': {('item', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:40
+
+from django.db import migrations
+
+
+# FULLTEXT indexes used by app.services.search.MySQLSearchBackend.
+# Other databases (SQLite in development/tests) build their own
+# index on first use, so this migration is a no-op there.
+FULLTEXT_INDEXES = [
+    ("app_item", "app_item_name_description_ft", "name, description"),
+    ("app_store", "app_store_brand_name_bio_ft", "brand_name, bio"),
+]
+
+
+def add_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+
+    for table, index, columns in FULLTEXT_INDEXES:
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD FULLTEXT INDEX {index} ({columns})"
+        )
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+
+    for table, index, _columns in FULLTEXT_INDEXES:
+        schema_editor.execute(f"ALTER TABLE {table} DROP INDEX {index}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0036_itemcategory'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_indexes, drop_fulltext_indexes),
+    ]
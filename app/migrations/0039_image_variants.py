@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0038_mediaupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='storeimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
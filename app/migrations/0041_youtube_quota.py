@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0040_video_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YouTubeQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('units_used', models.PositiveIntegerField(default=0)),
+                ('uploads', models.PositiveIntegerField(default=0)),
+                ('exhausted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
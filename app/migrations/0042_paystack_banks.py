@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0041_youtube_quota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaystackBank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paystack_id', models.PositiveIntegerField(unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('code', models.CharField(db_index=True, max_length=20)),
+                ('active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.utils.text import slugify
 from django.utils import timezone
 import random
 import re
+import uuid
 from django.urls import reverse
 
 # Email OTP
@@ -167,9 +168,29 @@ class Store(models.Model):
             "customer experience."
         )
     def save(self, *args, **kwargs):
+        from .services.store_cache import invalidate_store
+        from .services.entitlements import invalidate_entitlement
+        from .services.search_index import store_index
+
+        previous_slug = self.slug
         if not self.slug or self.brand_name_changed():
             self.slug = slugify(self.brand_name)
         super().save(*args, **kwargs)
+        invalidate_store(self.pk, previous_slug, self.slug)
+        invalidate_entitlement(self.owner_id)
+        store_index.upsert(self.pk, self.brand_name)
+
+    def delete(self, *args, **kwargs):
+        from .services.store_cache import invalidate_store
+        from .services.entitlements import invalidate_entitlement
+        from .services.search_index import store_index
+
+        store_id, slug, owner_id = self.pk, self.slug, self.owner_id
+        result = super().delete(*args, **kwargs)
+        invalidate_store(store_id, slug)
+        invalidate_entitlement(owner_id)
+        store_index.remove(store_id)
+        return result
 
     def brand_name_changed(self):
         if not self.pk:
@@ -203,6 +224,7 @@ class StoreImage(models.Model):
     item = models.ForeignKey('Item', on_delete=models.CASCADE, related_name='extra_files', null=True, blank=True)
     image = models.ImageField(upload_to='store_images/', blank=True, null=True)
     image_url = models.URLField(max_length=500, blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True)  # {"thumb": url, "card": url}, see app.services.images
     file = models.FileField(upload_to='store_media/', blank=True, null=True)
     name = models.CharField(max_length=255, blank=True)
     CURRENCY_CHOICES = [
@@ -227,6 +249,21 @@ class StoreImage(models.Model):
     )
 
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._refresh_item_covers()
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self._refresh_item_covers()
+
+    def _refresh_item_covers(self):
+        from app.services.covers import refresh_covers
+        match = models.Q(pk=self.item_id) if self.item_id else models.Q(pk__in=[])
+        if self.name:
+            match |= models.Q(store_id=self.store_id, name=self.name)
+        refresh_covers(match)
+
     def __str__(self):
         return f"Extra file for {self.store.brand_name} - {self.item.name if self.item else 'No item'}"
 
@@ -244,8 +281,12 @@ class Item(models.Model):
     currency = models.CharField(max_length=5, blank=True, null=True,)  # ✅ give safe default
     image = models.ImageField(upload_to='item_images/', blank=True, null=True)
     image_url = models.URLField(max_length=500, blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True)  # {"thumb": url, "card": url}, see app.services.images
+    # Resolved by app.services.covers; None = not resolved yet, "" = no image
+    cover_url = models.CharField(max_length=500, blank=True, null=True, editable=False)
     description = models.TextField(blank=True, null=True)
     views = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)  # kept in sync by like_item
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(default=timezone.now)
     ORDER_SYSTEM_CHOICES = [
@@ -279,8 +320,29 @@ class Item(models.Model):
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
+        is_new = self.pk is None
         super().save(*args, **kwargs)
 
+        # The image file only has its final URL once saved
+        from app.services.covers import own_cover
+        cover = own_cover(self) or ("" if is_new else None)
+        if cover != self.cover_url:
+            self.cover_url = cover
+            Item.objects.filter(pk=self.pk).update(cover_url=cover)
+
+        from app.services.categorizer import categorize_items
+        categorize_items([self])
+
+        from app.services.search_index import product_index
+        product_index.upsert(self.pk, self.name)
+
+    def delete(self, *args, **kwargs):
+        from app.services.search_index import product_index
+        item_id = self.pk
+        result = super().delete(*args, **kwargs)
+        product_index.remove(item_id)
+        return result
+
     def get_absolute_url(self):
         return reverse(
             "store_product_detail",
@@ -292,6 +354,16 @@ class Item(models.Model):
 
     def get_store_url(self):
         return self.store.get_absolute_url()
+
+    @property
+    def full_image_url(self):
+        from app.services.covers import full_image_url
+        return full_image_url(self)
+
+    @property
+    def cover_srcset(self):
+        from app.services.covers import cover_srcset
+        return cover_srcset(self)
 # subscription
 
 class Subscription(models.Model):
@@ -345,6 +417,20 @@ class Subscription(models.Model):
         default=False
     )
 
+    def save(self, *args, **kwargs):
+        from .services.entitlements import invalidate_entitlement
+
+        super().save(*args, **kwargs)
+        invalidate_entitlement(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        from .services.entitlements import invalidate_entitlement
+
+        user_id = self.user_id
+        result = super().delete(*args, **kwargs)
+        invalidate_entitlement(user_id)
+        return result
+
     def is_premium(self):
         if not self.is_active:
             return False
@@ -382,6 +468,28 @@ class CustomDomain(models.Model):
     purchased_from_waapfolio = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        from .services.domain_index import update_domain
+
+        previous_domain = None
+        if self.pk:
+            previous_domain = (
+                CustomDomain.objects
+                .filter(pk=self.pk)
+                .values_list("domain", flat=True)
+                .first()
+            )
+        super().save(*args, **kwargs)
+        update_domain(self, previous_domain)
+
+    def delete(self, *args, **kwargs):
+        from .services.domain_index import remove_domain
+
+        domain = self.domain
+        result = super().delete(*args, **kwargs)
+        remove_domain(domain)
+        return result
 import uuid
 
 class WithdrawalRequest(models.Model):
@@ -484,10 +592,97 @@ class ProductMedia(models.Model):
                 self.youtube_id = match.group(1)
         super().save(*args, **kwargs)
 
+        from app.services.covers import refresh_covers
+        refresh_covers(pk=self.product_id)
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+
+        from app.services.covers import refresh_covers
+        refresh_covers(pk=self.product_id)
+
     def __str__(self):
         return f"Media for {self.product.name}"
 
 
+# Media Upload (queued ImgBB upload, see app.services.uploads)
+class MediaUpload(models.Model):
+    KIND_CHOICES = [
+        ("item_image", "Item cover"),
+        ("store_image", "Extra image"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='media_uploads')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, null=True, blank=True, related_name='uploads')
+    store_image = models.ForeignKey(StoreImage, on_delete=models.CASCADE, null=True, blank=True, related_name='uploads')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    remote_url = models.URLField(max_length=500, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.kind} upload #{self.pk} ({self.status})"
+
+
+# Video Upload (resumable upload spooled on our side, then sent to
+# YouTube in the background, see app.services.video_uploads)
+class VideoUpload(models.Model):
+    STATUS_CHOICES = [
+        ("receiving", "Receiving"),
+        ("received", "Received"),
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='video_uploads')
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, null=True, blank=True, related_name='video_uploads')
+    filename = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)  # bytes received so far
+    progress = models.PositiveSmallIntegerField(default=0)  # % sent to YouTube
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="receiving", db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    youtube_id = models.CharField(max_length=50, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"Video upload {self.token} ({self.status})"
+
+
+# YouTube API quota used per Pacific-time day (see app.services.youtube_quota)
+class YouTubeQuota(models.Model):
+    day = models.DateField(unique=True)
+    units_used = models.PositiveIntegerField(default=0)
+    uploads = models.PositiveIntegerField(default=0)
+    exhausted_at = models.DateTimeField(null=True, blank=True)  # YouTube said no
+
+    def __str__(self):
+        return f"YouTube quota {self.day}: {self.units_used} units"
+
+
 # Item Views
 class ItemView(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='views_log')
@@ -496,6 +691,35 @@ class ItemView(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
 
 
+# Storefront Impressions
+class StoreImpression(models.Model):
+    """
+    One row per storefront page view, listing the items shown.
+    Aggregated into Item.views / ItemView by the process_impressions
+    command, so page views never write per item.
+    """
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='impressions')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+    item_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Impression on {self.store_id} ({len(self.item_ids)} items)"
+
+
+# Item Categories (maintained by app.services.categorizer)
+class ItemCategory(models.Model):
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='categories')
+    category = models.CharField(max_length=30, db_index=True)
+
+    class Meta:
+        unique_together = ('item', 'category')
+
+    def __str__(self):
+        return f"{self.item_id} in {self.category}"
+
+
 # Item Likes
 class ItemLike(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='likes')
@@ -1092,6 +1316,108 @@ class BankAccount(models.Model):
             f"{self.bank_name} "
             f"({self.account_number})"
         )
+class PaystackBank(models.Model):
+    """
+    Local copy of Paystack's bank list (see app.services.banks).
+    """
+
+    paystack_id = models.PositiveIntegerField(
+        unique=True
+    )
+
+    name = models.CharField(
+        max_length=255
+    )
+
+    code = models.CharField(
+        max_length=20,
+        db_index=True
+    )
+
+    active = models.BooleanField(
+        default=True
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+
+class PaystackEvent(models.Model):
+    """
+    A verified Paystack webhook, stored before it is processed
+    (see app.services.paystack_events).
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("processed", "Processed"),
+        ("ignored", "Ignored"),
+        ("failed", "Failed"),
+    ]
+
+    # "<event>:<reference>"; Paystack retries a webhook until it gets a
+    # 200, and a repeat delivery must not be applied twice
+    key = models.CharField(
+        max_length=255,
+        unique=True
+    )
+
+    event = models.CharField(
+        max_length=100
+    )
+
+    reference = models.CharField(
+        max_length=150,
+        blank=True,
+        db_index=True
+    )
+
+    payload = models.JSONField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending",
+        db_index=True
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0
+    )
+
+    last_error = models.TextField(
+        blank=True
+    )
+
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now
+    )
+
+    received_at = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+
 class SupplierAccess(models.Model):
 
     seller = models.ForeignKey(
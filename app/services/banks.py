@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from app.models import PaystackBank
+
+from .paystack import UNAVAILABLE, paystack
+
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+# The bank list barely changes; refresh_paystack_banks keeps it current
+# and a page load only refreshes it when it is older than this.
+BANKS_MAX_AGE = timedelta(days=7)
+
+RESOLVE_TTL = 60 * 10
+RESOLVE_FAILED_TTL = 60
+
+
+# =========================
+# 2. BANK DIRECTORY
+# =========================
+
+def refresh_banks():
+    """
+    Replaces the local bank list with Paystack's. Returns the number of
+    banks, or None (keeping the old list) if Paystack couldn't be read.
+    """
+    res = paystack.list_banks()
+
+    if not res.get("status"):
+        return None
+
+    banks = [
+        PaystackBank(
+            paystack_id=bank["id"],
+            name=bank["name"],
+            code=bank["code"],
+            active=bank.get("active", True),
+            updated_at=timezone.now(),
+        )
+        for bank in res.get("data") or []
+    ]
+
+    # MySQL upserts on any unique key and rejects unique_fields
+    target = (
+        {"unique_fields": ["paystack_id"]}
+        if connection.features.supports_update_conflicts_with_target
+        else {}
+    )
+
+    with transaction.atomic():
+        PaystackBank.objects.bulk_create(
+            banks,
+            update_conflicts=True,
+            update_fields=["name", "code", "active", "updated_at"],
+            **target
+        )
+
+        # Banks Paystack no longer lists
+        PaystackBank.objects.exclude(
+            paystack_id__in=[b.paystack_id for b in banks]
+        ).update(active=False)
+
+    return len(banks)
+
+
+def get_banks():
+    """
+    Active banks by name, from the local table; Paystack is only called
+    when the table is empty or older than BANKS_MAX_AGE.
+    """
+    newest = PaystackBank.objects.order_by("-updated_at").values_list(
+        "updated_at", flat=True
+    ).first()
+
+    if newest is None or newest < timezone.now() - BANKS_MAX_AGE:
+        refresh_banks()
+
+    return list(PaystackBank.objects.filter(active=True))
+
+
+def bank_name(code):
+    return (
+        PaystackBank.objects
+        .filter(code=code, active=True)
+        .values_list("name", flat=True)
+        .first()
+    ) or ""
+
+
+# =========================
+# 3. ACCOUNT RESOLUTION
+# =========================
+
+def resolve_account(account_number, bank_code):
+    """
+    Paystack's bank/resolve response, cached per (account_number,
+    bank_code) so a seller retrying the form doesn't spend rate limit.
+    Rejections are cached briefly; "Paystack unavailable" is not cached.
+    """
+    key = f"paystack:resolve:{bank_code}:{account_number}"
+
+    res = cache.get(key)
+    if res is not None:
+        return res
+
+    res = paystack.resolve_account(account_number, bank_code)
+
+    if res.get("status"):
+        cache.set(key, res, RESOLVE_TTL)
+    elif res.get("message") != UNAVAILABLE:
+        cache.set(key, res, RESOLVE_FAILED_TTL)
+
+    return res
@@ -0,0 +1,100 @@
+from app.models import ItemCategory
+
+
+# =========================
+# 1. KEYWORD MAP
+# =========================
+
+# 🔥 MINI-AI CATEGORY KEYWORD MAP
+CATEGORY_KEYWORDS = {
+    "food": [
+        "food", "meal", "snack", "drink", "cake", "bread", "pizza", "burger",
+        "chicken", "donut", "doughnut", "rice", "fruit", "vegetable", "beverage"
+    ],
+    "clothing": [
+        "shirt", "t-shirt", "cloth", "clothes", "jeans", "jacket", "hoodie",
+        "dress", "shoe", "sneaker", "cap", "baggy", "shorts"
+    ],
+    "tech": [
+        "laptop", "phone", "computer", "tablet", "charger", "earbuds",
+        "headset", "smartwatch", "keyboard", "mouse"
+    ],
+    "home": [
+        "sofa", "chair", "bed", "furniture", "table", "home", "decor",
+        "cookware", "pot", "pan", "pillow"
+    ],
+    "beauty": [
+        "cream", "makeup", "skincare", "lotion", "perfume", "lipstick",
+        "hair", "beauty", "cosmetic"
+    ],
+    "gaming": [
+        "game", "gaming", "controller", "console", "playstation",
+        "xbox", "nintendo"
+    ],
+    "accessories": [
+        "bag", "belt", "watch", "jewelry", "ring", "bracelet",
+        "necklace", "wallet", "accessory"
+    ],
+}
+
+
+# =========================
+# 2. CATEGORIZER
+# =========================
+
+def categorize(name, description=""):
+    """
+    The categories whose keywords appear anywhere in the name or
+    description (same substring match as the old icontains filter).
+    """
+    text = f"{name or ''} {description or ''}".lower()
+
+    return {
+        category
+        for category, keywords in CATEGORY_KEYWORDS.items()
+        if any(kw in text for kw in keywords)
+    }
+
+
+def categorize_items(items):
+    """
+    Brings the ItemCategory rows of `items` in line with their text:
+    one SELECT, then at most one DELETE and one INSERT.
+    Returns (added, removed).
+    """
+    items = list(items)
+
+    if not items:
+        return 0, 0
+
+    wanted = {
+        (item.id, category)
+        for item in items
+        for category in categorize(item.name, item.description)
+    }
+
+    existing = {
+        (row.item_id, row.category): row.id
+        for row in ItemCategory.objects.filter(
+            item_id__in=[item.id for item in items]
+        )
+    }
+
+    stale = [
+        row_id for key, row_id in existing.items()
+        if key not in wanted
+    ]
+
+    if stale:
+        ItemCategory.objects.filter(id__in=stale).delete()
+
+    ItemCategory.objects.bulk_create(
+        [
+            ItemCategory(item_id=item_id, category=category)
+            for item_id, category in wanted
+            if (item_id, category) not in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+    return len(wanted - existing.keys()), len(stale)
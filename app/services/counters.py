@@ -0,0 +1,140 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, When, Value
+
+from app.models import Store
+
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# 1. BUFFER
+# =========================
+
+# Increments are accumulated in the shared cache (so every worker sees
+# the same pending counts and nothing is lost when a worker is recycled)
+# and written to the database by `manage.py flush_counters`. A
+# per-process cache can't be flushed from cron, so without a shared one
+# (settings.CACHE_IS_SHARED) each increment is written straight away.
+
+COUNTER_FIELDS = ["total_views", "total_orders"]
+
+# Stores read per cache.get_many when flushing
+FLUSH_BATCH = 500
+
+
+def _key(field, store_id):
+    return f"counters:{field}:{store_id}"
+
+
+def bulk_increment(model, field, counts):
+    """
+    counts: {pk: amount}
+    Adds each amount to `field` in a single UPDATE using F(),
+    so concurrent writers never lose increments.
+    """
+    if not counts:
+        return 0
+
+    return model.objects.filter(
+        pk__in=counts.keys()
+    ).update(**{
+        field: F(field) + Case(
+            *[
+                When(pk=pk, then=Value(amount))
+                for pk, amount in counts.items()
+            ],
+            default=Value(0),
+        )
+    })
+
+
+# =========================
+# 2. PUBLIC API
+# =========================
+
+def increment(store_id, field, amount=1):
+    """
+    Replaces `store.<field> += 1; store.save()`.
+    No database query on the request path (with a shared cache), and
+    never raises: a cache outage costs a few counts, not the page.
+    """
+    if field not in COUNTER_FIELDS:
+        raise ValueError(f"Unknown store counter: {field}")
+
+    key = _key(field, store_id)
+
+    try:
+        if not settings.CACHE_IS_SHARED:
+            bulk_increment(Store, field, {store_id: amount})
+            return
+
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # First increment since the last flush
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+    except Exception:
+        logger.warning("Could not count %s for store %s", field, store_id, exc_info=True)
+
+
+def pending(store_id, field):
+    try:
+        return cache.get(_key(field, store_id)) or 0
+    except Exception:
+        return 0
+
+
+def get_total(store, field):
+    """
+    Near-real-time total: the stored value plus the increments not
+    flushed yet (the same for every worker).
+    """
+    return (getattr(store, field) or 0) + pending(store.id, field)
+
+
+def _flush_counts(field, counts):
+    """
+    Takes `counts` out of the cache (decr, so increments arriving
+    meanwhile stay for the next flush), then writes them; on a database
+    error they are put back.
+    """
+    for store_id, amount in counts.items():
+        cache.decr(_key(field, store_id), amount)
+
+    try:
+        return bulk_increment(Store, field, counts)
+    except Exception:
+        for store_id, amount in counts.items():
+            increment(store_id, field, amount)
+        raise
+
+
+def flush():
+    """
+    Writes all buffered increments: one UPDATE per counter field and
+    batch of stores. Returns the number of rows updated.
+    """
+    store_ids = list(Store.objects.values_list("id", flat=True))
+    updated = 0
+
+    for start in range(0, len(store_ids), FLUSH_BATCH):
+        batch = store_ids[start:start + FLUSH_BATCH]
+
+        for field in COUNTER_FIELDS:
+            keys = {_key(field, store_id): store_id for store_id in batch}
+
+            counts = {
+                keys[key]: amount
+                for key, amount in cache.get_many(keys).items()
+                if amount
+            }
+
+            if counts:
+                updated += _flush_counts(field, counts)
+
+    return updated
@@ -0,0 +1,170 @@
+from django.db.models import Q
+from django.templatetags.static import static
+
+from app.models import Item, ProductMedia, StoreImage
+
+from .images import VARIANTS
+
+
+PLACEHOLDER = "images/no-image.png"
+
+
+# =========================
+# 1. RESOLUTION ORDER
+# =========================
+
+def _file_url(field):
+    try:
+        return field.url if field else ""
+    except Exception:
+        return ""
+
+
+def own_cover(item):
+    """
+    The item's own card-sized variant, image_url or image, or ""
+    (no queries).
+    """
+    return (
+        (item.image_variants or {}).get("card")
+        or item.image_url
+        or _file_url(item.image)
+    )
+
+
+def _extra_cover(extra):
+    return (
+        (extra.image_variants or {}).get("card")
+        or extra.image_url
+        or _file_url(extra.image)
+        or _file_url(extra.file)
+    )
+
+
+def _media_cover(media):
+    if media.file:
+        return _file_url(media.file)
+    if media.youtube_id:
+        return f"https://img.youtube.com/vi/{media.youtube_id}/hqdefault.jpg"
+    return ""
+
+
+def resolve_cover_url(item, extras=(), media=()):
+    """
+    item card variant / image_url / image -> extra StoreImage -> ProductMedia
+    (file or YouTube thumbnail). Returns "" when nothing is found.
+    """
+    cover = own_cover(item)
+
+    for extra in extras:
+        if cover:
+            break
+        cover = _extra_cover(extra)
+
+    for m in media:
+        if cover:
+            break
+        cover = _media_cover(m)
+
+    return cover
+
+
+def cover_or_placeholder(item):
+    return item.cover_url or static(PLACEHOLDER)
+
+
+def full_image_url(item):
+    """
+    The full-size picture for the product page (image_url / image hold
+    the 1600px variant), falling back to the cover. No queries.
+    """
+    return item.image_url or _file_url(item.image) or item.cover_url or ""
+
+
+def cover_srcset(item):
+    """
+    "<thumb> 320w, <card> 800w" for grid <img srcset> when the cover is
+    the item's own card variant, else "".
+    """
+    variants = item.image_variants or {}
+
+    if not variants.get("thumb") or variants.get("card") != item.cover_url:
+        return ""
+
+    return ", ".join(
+        f"{variants[name]} {VARIANTS[name]}w" for name in ("thumb", "card")
+    )
+
+
+# =========================
+# 2. BULK RESOLVER
+# =========================
+
+def with_covers(items):
+    """
+    Fills Item.cover_url for any item not resolved yet and persists it.
+
+    Items already resolved cost nothing; the rest cost one StoreImage
+    query, one ProductMedia query and one bulk UPDATE for the whole list.
+    Returns the items as a list.
+    """
+    items = list(items)
+
+    pending = [item for item in items if item.cover_url is None]
+
+    if not pending:
+        return items
+
+    item_ids = [item.id for item in pending]
+
+    extras = StoreImage.objects.filter(
+        Q(item_id__in=item_ids)
+        | Q(
+            store_id__in={item.store_id for item in pending},
+            name__in={item.name for item in pending},
+        )
+    ).order_by("id")
+
+    extras_by_item = {}
+    extras_by_name = {}
+    for extra in extras:
+        if extra.item_id:
+            extras_by_item.setdefault(extra.item_id, []).append(extra)
+        extras_by_name.setdefault((extra.store_id, extra.name), []).append(extra)
+
+    media_by_item = {}
+    for m in ProductMedia.objects.filter(
+        product_id__in=item_ids
+    ).order_by("id"):
+        media_by_item.setdefault(m.product_id, []).append(m)
+
+    for item in pending:
+        item.cover_url = resolve_cover_url(
+            item,
+            extras=(
+                extras_by_item.get(item.id, [])
+                + extras_by_name.get((item.store_id, item.name), [])
+            ),
+            media=media_by_item.get(item.id, []),
+        )
+
+    Item.objects.bulk_update(pending, ["cover_url"], batch_size=500)
+
+    return items
+
+
+# =========================
+# 3. INVALIDATION
+# =========================
+
+def refresh_covers(*filters, **lookup):
+    """
+    Re-resolves the cover of every item matching the filters.
+    Called when an item's extra images or media change.
+    """
+    items = list(Item.objects.filter(*filters, **lookup))
+
+    for item in items:
+        item.cover_url = None
+
+    with_covers(items)
@@ -0,0 +1,146 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+from ..models import CustomDomain
+
+
+# =========================
+# 1. INDEX STATE
+# =========================
+
+# host -> store_id for every verified custom domain.
+_hosts = {}
+_lock = threading.Lock()
+
+_state = {
+    "loaded": False,
+    "version": None,
+    "checked_at": 0.0,
+}
+
+# Other workers bump this key when a CustomDomain changes.
+VERSION_KEY = "custom_domains:version"
+
+# How often a worker checks whether another worker changed the index.
+VERSION_CHECK_INTERVAL = 30
+
+
+def normalize_host(host):
+    """
+    'HTTPS://WWW.Shop.com/' -> 'shop.com'
+    """
+    host = (host or "").strip().lower()
+
+    if "://" in host:
+        host = host.split("://", 1)[1]
+
+    host = host.split("/", 1)[0].split(":", 1)[0].rstrip(".")
+
+    if host.startswith("www."):
+        host = host[4:]
+
+    return host
+
+
+# =========================
+# 2. LOADING
+# =========================
+
+def load_index():
+    """
+    Full rebuild: one query for all verified domains.
+    Runs once per worker (first request) and when another worker
+    reports a change.
+    """
+    rows = CustomDomain.objects.filter(
+        is_verified=True
+    ).values_list("domain", "store_id")
+
+    hosts = {
+        normalize_host(domain): store_id
+        for domain, store_id in rows
+        if normalize_host(domain)
+    }
+
+    with _lock:
+        _hosts.clear()
+        _hosts.update(hosts)
+        _state["loaded"] = True
+        _state["version"] = cache.get(VERSION_KEY)
+        _state["checked_at"] = time.monotonic()
+
+
+def _ensure_fresh():
+    if not _state["loaded"]:
+        load_index()
+        return
+
+    now = time.monotonic()
+
+    if now - _state["checked_at"] < VERSION_CHECK_INTERVAL:
+        return
+
+    _state["checked_at"] = now
+
+    if cache.get(VERSION_KEY) != _state["version"]:
+        load_index()
+
+
+# =========================
+# 3. LOOKUP (HOT PATH)
+# =========================
+
+def get_store_id_for_host(host):
+    """
+    Returns the store_id serving this host, or None.
+    A plain dict lookup; no query once the index is loaded.
+    """
+    _ensure_fresh()
+
+    return _hosts.get(normalize_host(host))
+
+
+# =========================
+# 4. INCREMENTAL UPDATES
+# =========================
+
+def _bump_version():
+    """
+    Tells the other workers to reload. The local version is left alone:
+    another worker may have bumped it first, and marking that change as
+    seen would keep it from ever being loaded here. This worker simply
+    reloads once too.
+    """
+    cache.set(VERSION_KEY, time.time(), None)
+
+
+def update_domain(custom_domain, previous_domain=None):
+    """
+    Called from CustomDomain.save().
+    """
+    host = normalize_host(custom_domain.domain)
+    previous_host = normalize_host(previous_domain)
+
+    with _lock:
+        if previous_host and previous_host != host:
+            _hosts.pop(previous_host, None)
+
+        if host:
+            if custom_domain.is_verified:
+                _hosts[host] = custom_domain.store_id
+            else:
+                _hosts.pop(host, None)
+
+    _bump_version()
+
+
+def remove_domain(domain):
+    """
+    Called from CustomDomain.delete().
+    """
+    with _lock:
+        _hosts.pop(normalize_host(domain), None)
+
+    _bump_version()
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..models import Store
+
+
+# =========================
+# 1. ENTITLEMENT RECORD
+# =========================
+
+ENTITLEMENT_TTL = 60 * 60
+
+# invalidate_entitlement() only reaches the cache of the process that
+# saved the change; without a shared cache other workers must not keep
+# a record (e.g. extra stores suspended after an upgrade) for long.
+LOCAL_ENTITLEMENT_TTL = 30
+
+PREMIUM_PLANS = ["premium_monthly", "premium_yearly"]
+
+
+def _cache_key(owner_id):
+    return f"entitlement:{owner_id}"
+
+
+def build_entitlement(owner_id):
+    """
+    One query: the owner's oldest store joined with their subscription.
+
+    Returns:
+        {
+            "premium_until": datetime or None,
+            "active_store_ids": [first_store_id] (empty if no stores),
+        }
+
+    While premium_until is in the future every store is active,
+    otherwise only active_store_ids are.
+    """
+    row = (
+        Store.objects
+        .filter(owner_id=owner_id)
+        .order_by("created_at")
+        .values(
+            "id",
+            "owner__subscription__plan",
+            "owner__subscription__is_active",
+            "owner__subscription__expires_at",
+        )
+        .first()
+    )
+
+    if not row:
+        return {"premium_until": None, "active_store_ids": []}
+
+    premium_until = None
+
+    if (
+        row["owner__subscription__is_active"]
+        and row["owner__subscription__plan"] in PREMIUM_PLANS
+    ):
+        premium_until = row["owner__subscription__expires_at"]
+
+    return {
+        "premium_until": premium_until,
+        "active_store_ids": [row["id"]],
+    }
+
+
+def get_entitlement(owner_id):
+    record = cache.get(_cache_key(owner_id))
+
+    if record is None:
+        record = build_entitlement(owner_id)
+        cache.set(
+            _cache_key(owner_id),
+            record,
+            ENTITLEMENT_TTL if settings.CACHE_IS_SHARED else LOCAL_ENTITLEMENT_TTL
+        )
+
+    return record
+
+
+def invalidate_entitlement(owner_id):
+    """
+    Called whenever a Subscription or Store of this owner changes.
+    """
+    if owner_id:
+        cache.delete(_cache_key(owner_id))
+
+
+# =========================
+# 2. CHECKS
+# =========================
+
+def is_store_active(store):
+    """
+    Zero queries on a warm cache. Expiry is checked against the cached
+    premium_until, so a lapsed subscription takes effect immediately.
+    """
+    record = get_entitlement(store.owner_id)
+
+    premium_until = record["premium_until"]
+
+    if premium_until and premium_until > timezone.now():
+        return True
+
+    active_store_ids = record["active_store_ids"]
+
+    return not active_store_ids or store.id in active_store_ids
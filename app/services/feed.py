@@ -0,0 +1,112 @@
+import hashlib
+import random
+
+from django.core.cache import cache
+
+from app.models import Item
+
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+# Candidate ids are re-read from the database at most this often
+# (build_marketplace_feed refreshes the unfiltered feed ahead of time).
+FEED_TTL = 10 * 60
+
+# Fair mix: at most this many items per store
+PER_STORE = 4
+
+
+def _feed_key(query="", category=""):
+    digest = hashlib.md5(
+        f"{query.lower()}|{category.lower()}".encode()
+    ).hexdigest()
+    return f"marketplace_feed:{digest}"
+
+
+# =========================
+# 2. CANDIDATES
+# =========================
+
+def marketplace_items():
+    return Item.objects.filter(store__is_demo=False)
+
+
+def build_candidates(queryset):
+    """
+    [(store_id, [item ids, newest first]), ...] for the queryset.
+    One query over two integer columns; no rows are instantiated.
+    """
+    groups = {}
+
+    for item_id, store_id in (
+        queryset
+        .order_by("-created_at")
+        .values_list("id", "store_id")
+    ):
+        groups.setdefault(store_id or 0, []).append(item_id)
+
+    return sorted(groups.items())
+
+
+def get_candidates(queryset, query="", category="", refresh=False):
+    key = _feed_key(query, category)
+
+    candidates = None if refresh else cache.get(key)
+
+    if candidates is None:
+        candidates = build_candidates(queryset)
+        cache.set(key, candidates, FEED_TTL)
+
+    return candidates
+
+
+def refresh_feed():
+    """
+    Re-materializes the unfiltered feed (run from build_marketplace_feed).
+    Returns the number of candidate items.
+    """
+    candidates = get_candidates(marketplace_items(), refresh=True)
+    return sum(len(item_ids) for _store_id, item_ids in candidates)
+
+
+# =========================
+# 3. FAIR MIX
+# =========================
+
+def new_seed():
+    return random.randrange(1, 2 ** 31)
+
+
+def fair_mix_ids(queryset, seed, query="", category=""):
+    """
+    Up to PER_STORE random items from every store, shuffled together.
+    The same seed gives the same order, so a visitor's pages line up;
+    the mix itself is cached per seed for the life of the candidates.
+    """
+    key = f"{_feed_key(query, category)}:{seed}"
+
+    ids = cache.get(key)
+
+    if ids is None:
+        rng = random.Random(seed)
+
+        ids = []
+        for _store_id, item_ids in get_candidates(queryset, query, category):
+            if len(item_ids) > PER_STORE:
+                item_ids = rng.sample(item_ids, PER_STORE)
+            ids.extend(item_ids)
+
+        rng.shuffle(ids)
+        cache.set(key, ids, FEED_TTL)
+
+    return ids
+
+
+def fetch_items(ids):
+    """
+    The Item rows for `ids` (with their store), in the same order.
+    """
+    items = Item.objects.select_related("store").in_bulk(ids)
+    return [items[i] for i in ids if i in items]
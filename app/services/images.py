@@ -0,0 +1,115 @@
+import os
+import uuid
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+# =========================
+# 1. VARIANTS
+# =========================
+
+# Longest side in pixels
+VARIANTS = {
+    "thumb": 320,
+    "card": 800,
+    "full": 1600,
+}
+
+WEBP_QUALITY = 80
+
+
+def make_variants(upload, names=None):
+    """
+    {"thumb": ContentFile, "card": ContentFile, "full": ContentFile}
+    (or just the variants in `names`)
+
+    Each variant is rotated upright (EXIF orientation applied), resized
+    to fit VARIANTS[name] and saved as WebP without EXIF/GPS or other
+    metadata. Raises if the upload is not an image Pillow can read.
+    """
+    stem = os.path.splitext(os.path.basename(getattr(upload, "name", "") or ""))[0]
+    stem = stem or uuid.uuid4().hex
+
+    upload.seek(0)
+
+    with Image.open(upload) as original:
+        image = ImageOps.exif_transpose(original)
+
+        has_alpha = image.mode in ("RGBA", "LA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        # A fresh image carries pixels only: no EXIF, ICC or XMP
+        clean = Image.new(image.mode, image.size)
+        clean.paste(image)
+
+    variants = {}
+
+    for name, size in VARIANTS.items():
+        if names and name not in names:
+            continue
+
+        variant = clean.copy()
+        variant.thumbnail((size, size), Image.LANCZOS)
+
+        buffer = BytesIO()
+        variant.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+
+        variants[name] = ContentFile(
+            buffer.getvalue(),
+            name=f"{stem}-{name}.webp"
+        )
+
+    return variants
+
+
+# =========================
+# 2. MODEL HELPERS
+# =========================
+
+def optimize_image(instance, upload, folder):
+    """
+    For Item / StoreImage before save(): the full variant replaces the
+    uploaded original in instance.image (so that is what gets stored and
+    sent to ImgBB), and the smaller variants are saved alongside with
+    their URLs recorded in instance.image_variants.
+
+    The previous picture's variants are dropped first, so a new upload
+    Pillow cannot read (e.g. a video or a corrupt file) is stored as-is
+    and returns False, rather than leaving the old card as the cover.
+    """
+    instance.image_variants = {}
+
+    try:
+        variants = make_variants(upload)
+    except Exception:
+        return False
+
+    urls = {}
+    for name in ("thumb", "card"):
+        path = default_storage.save(
+            f"{folder}/{name}/{variants[name].name}",
+            variants[name]
+        )
+        urls[name] = default_storage.url(path)
+
+    instance.image = variants["full"]
+    instance.image_variants = urls
+
+    return True
+
+
+def optimized_file(upload, variant="card"):
+    """
+    One WebP variant of the upload, or the upload itself if it isn't an
+    image Pillow can read (used for the brand logo).
+    """
+    try:
+        return make_variants(upload, names=[variant])[variant]
+    except Exception:
+        upload.seek(0)
+        return upload
@@ -0,0 +1,111 @@
+from collections import Counter
+
+from django.db import transaction
+
+from app.models import (
+    Item,
+    ItemView,
+    StoreImpression,
+)
+from app.services.counters import bulk_increment
+
+
+# =========================
+# 1. RECORDING (REQUEST PATH)
+# =========================
+
+def record_impression(request, store, item_ids):
+    """
+    One INSERT per storefront page view, whatever the catalogue size.
+    """
+    session = request.session
+
+    # A session the view has just started only gets its key when saved
+    if not session.session_key and session.modified:
+        session.save()
+
+    StoreImpression.objects.create(
+        store=store,
+        user=request.user if request.user.is_authenticated else None,
+        session_key=session.session_key,
+        item_ids=list(item_ids),
+    )
+
+
+# =========================
+# 2. AGGREGATION (BACKGROUND)
+# =========================
+
+@transaction.atomic
+def process_impressions(batch_size=1000):
+    """
+    Folds a batch of impressions into ItemView (one per item/session,
+    as before) and Item.views, then deletes the batch.
+
+    Returns the number of impressions processed.
+    """
+    events = list(
+        StoreImpression.objects
+        .select_for_update()
+        .order_by("id")[:batch_size]
+    )
+
+    if not events:
+        return 0
+
+    # First sighting of each (item, session) in this batch
+    seen = {}
+    for event in events:
+        if not event.session_key:
+            continue
+
+        for item_id in event.item_ids:
+            seen.setdefault(
+                (item_id, event.session_key),
+                event.user_id
+            )
+
+    item_ids = {item_id for item_id, _ in seen}
+    session_keys = {session_key for _, session_key in seen}
+
+    # Items deleted since the page view are skipped
+    live_item_ids = set(
+        Item.objects.filter(
+            id__in=item_ids
+        ).values_list("id", flat=True)
+    )
+
+    already_viewed = set(
+        ItemView.objects.filter(
+            item_id__in=live_item_ids,
+            session_key__in=session_keys,
+        ).values_list("item_id", "session_key")
+    )
+
+    new_views = [
+        ItemView(
+            item_id=item_id,
+            user_id=user_id,
+            session_key=session_key,
+        )
+        for (item_id, session_key), user_id in seen.items()
+        if item_id in live_item_ids
+        and (item_id, session_key) not in already_viewed
+    ]
+
+    ItemView.objects.bulk_create(
+        new_views,
+        batch_size=500
+    )
+
+    bulk_increment(
+        Item,
+        "views",
+        Counter(view.item_id for view in new_views)
+    )
+
+    StoreImpression.objects.filter(
+        id__in=[event.id for event in events]
+    ).delete()
+
+    return len(events)
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from app.models import Item, ItemLike
+
+
+LIKED_ITEMS_TTL = 10 * 60
+
+
+def _cache_key(user_id):
+    return f"liked_items:{user_id}"
+
+
+# =========================
+# 1. PER-VISITOR LIKED SET
+# =========================
+
+def get_liked_item_ids(user):
+    """
+    Every item id this user has liked, as a set.
+    One query per cache miss, zero otherwise, whatever the grid size.
+    """
+    if not user.is_authenticated:
+        return set()
+
+    ids = cache.get(_cache_key(user.id))
+
+    if ids is None:
+        ids = set(
+            ItemLike.objects.filter(
+                user=user
+            ).values_list("item_id", flat=True)
+        )
+        cache.set(_cache_key(user.id), ids, LIKED_ITEMS_TTL)
+
+    return ids
+
+
+# =========================
+# 2. TOGGLE
+# =========================
+
+@transaction.atomic
+def toggle_like(item, user):
+    """
+    Likes or unlikes the item and keeps Item.like_count in step
+    inside the same transaction.
+
+    Returns (liked, like_count).
+    """
+    like, created = ItemLike.objects.get_or_create(
+        item=item,
+        user=user
+    )
+
+    if created:
+        Item.objects.filter(pk=item.pk).update(
+            like_count=F("like_count") + 1
+        )
+    else:
+        like.delete()
+        Item.objects.filter(pk=item.pk, like_count__gt=0).update(
+            like_count=F("like_count") - 1
+        )
+
+    cache.delete(_cache_key(user.id))
+
+    like_count = Item.objects.values_list(
+        "like_count", flat=True
+    ).get(pk=item.pk)
+
+    return created, like_count
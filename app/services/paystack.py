@@ -0,0 +1,187 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+BASE_URL = "https://api.paystack.co"
+
+# (connect, read) seconds, by endpoint (see PaystackClient._endpoint)
+TIMEOUTS = {
+    "transaction/initialize": (3.05, 15),
+    "transaction/verify": (3.05, 10),
+    "bank": (3.05, 10),
+    "bank/resolve": (3.05, 10),
+    "transferrecipient": (3.05, 15),
+}
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# GETs only: retrying a POST could initialize or create twice
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.25
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+POOL_SIZE = 10
+
+# What callers see when Paystack can't be reached; the same shape as a
+# Paystack error response, so `if not res["status"]` handles it.
+UNAVAILABLE = "Paystack is unavailable right now. Please try again."
+
+
+# =========================
+# 2. CLIENT
+# =========================
+
+class PaystackClient:
+    """
+    Every Paystack API call goes through one pooled keep-alive Session
+    per process (no TLS handshake per request), with a timeout for each
+    endpoint so a stalled Paystack can't hold a worker forever.
+
+    Methods return Paystack's JSON body as a dict.
+    """
+
+    def __init__(self, secret_key=None, pool_size=POOL_SIZE):
+        self._secret_key = secret_key
+        self._pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+        # endpoint -> {"calls", "errors", "total_ms", "max_ms"}
+        self.metrics = {}
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self._pool_size,
+                    )
+                    session.mount("https://", adapter)
+                    self._session = session
+
+        return self._session
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self._secret_key or settings.PAYSTACK_SECRET_KEY}",
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _endpoint(path):
+        """
+        "transaction/verify/WPF-12" -> "transaction/verify"
+        (the metrics and timeout key, without ids)
+        """
+        parts = path.strip("/").split("/")
+
+        if parts[0] in ("transaction", "bank"):
+            return "/".join(parts[:2])
+
+        return parts[0]
+
+    def _record(self, endpoint, elapsed, failed):
+        ms = elapsed * 1000
+
+        with self._lock:
+            stats = self.metrics.setdefault(
+                endpoint,
+                {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+
+        logger.info(
+            "paystack %s %.0fms%s", endpoint, ms, " (failed)" if failed else ""
+        )
+
+    def _send(self, method, path, endpoint, **kwargs):
+        started = time.monotonic()
+        failed = True
+
+        try:
+            response = self.session.request(
+                method,
+                f"{BASE_URL}/{path.lstrip('/')}",
+                headers=self._headers(),
+                timeout=TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT),
+                **kwargs
+            )
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self._record(endpoint, time.monotonic() - started, failed)
+
+    def request(self, method, path, params=None, json=None):
+        """
+        Retries GETs on connection errors, timeouts, 429 and 5xx, up to
+        MAX_RETRIES times with jittered exponential backoff. Returns
+        {"status": False, "message": ...} if Paystack can't be reached
+        or doesn't answer with JSON.
+        """
+        endpoint = self._endpoint(path)
+        retries = MAX_RETRIES if method == "GET" else 0
+
+        for attempt in range(retries + 1):
+            try:
+                response = self._send(
+                    method, path, endpoint, params=params, json=json
+                )
+
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response.json()
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    logger.warning("paystack %s unreachable: %s", endpoint, e)
+                    return {"status": False, "message": UNAVAILABLE}
+
+            except ValueError:
+                # Not JSON (e.g. an HTML error page from a proxy)
+                return {"status": False, "message": UNAVAILABLE}
+
+            # Full jitter: 0..0.25s, 0..0.5s, ...
+            time.sleep(random.uniform(0, BACKOFF_BASE * 2 ** attempt))
+
+    # ---------- Endpoints ----------
+
+    def initialize_transaction(self, **payload):
+        return self.request("POST", "transaction/initialize", json=payload)
+
+    def verify_transaction(self, reference):
+        return self.request("GET", f"transaction/verify/{reference}")
+
+    def list_banks(self, **params):
+        return self.request("GET", "bank", params=params or None)
+
+    def resolve_account(self, account_number, bank_code):
+        return self.request(
+            "GET",
+            "bank/resolve",
+            params={
+                "account_number": account_number,
+                "bank_code": bank_code,
+            },
+        )
+
+    def create_transfer_recipient(self, **payload):
+        return self.request("POST", "transferrecipient", json=payload)
+
+
+paystack = PaystackClient()
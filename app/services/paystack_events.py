@@ -0,0 +1,149 @@
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from app.models import Order, PaystackEvent
+
+from .settlement import settle_order, settle_subscription
+from .work_queue import claim, schedule_retry
+
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+# Events we act on; anything else is stored as "ignored"
+HANDLED_EVENTS = {"charge.success"}
+
+
+# =========================
+# 2. INGESTION (REQUEST PATH)
+# =========================
+
+def valid_signature(payload, signature):
+    """
+    x-paystack-signature is the HMAC-SHA512 of the raw body, keyed with
+    the secret key.
+    """
+    computed = hmac.new(
+        settings.PAYSTACK_SECRET_KEY.encode(),
+        payload,
+        hashlib.sha512
+    ).hexdigest()
+
+    return bool(signature) and hmac.compare_digest(computed, signature)
+
+
+def store_event(payload):
+    """
+    Saves a (verified) webhook body. Returns (event, created); a repeat
+    delivery of the same event and reference is not stored again.
+    Raises ValueError if the body isn't a JSON object.
+    """
+    body = json.loads(payload)
+
+    if not isinstance(body, dict):
+        raise ValueError("Webhook body is not a JSON object")
+
+    name = str(body.get("event") or "")
+    data = body.get("data") or {}
+    reference = str(data.get("reference") or data.get("id") or "")
+
+    key = f"{name}:{reference}"[:255]
+
+    try:
+        with transaction.atomic():
+            return PaystackEvent.objects.get_or_create(
+                key=key,
+                defaults={
+                    "event": name[:100],
+                    "reference": reference[:150],
+                    "payload": body,
+                    "status": "pending" if name in HANDLED_EVENTS else "ignored",
+                },
+            )
+    except IntegrityError:
+        # The same delivery, racing in on another worker
+        return PaystackEvent.objects.get(key=key), False
+
+
+# =========================
+# 3. WORKER
+# =========================
+
+def apply_event(event):
+    """
+    Settles what a charge.success paid for. Returns False if the charge
+    isn't for anything we know (nothing to do).
+    """
+    data = event.payload.get("data") or {}
+    metadata = data.get("metadata") or {}
+
+    if not isinstance(metadata, dict):
+        metadata = {}
+
+    if data.get("status", "success") != "success":
+        return False
+
+    if metadata.get("type") == "store_order":
+        order_id = metadata.get("order_id")
+
+        if not order_id and not Order.objects.filter(
+            paystack_reference=event.reference
+        ).exists():
+            return False
+
+        settle_order(event.reference, data, order_id=order_id)
+        return True
+
+    if metadata.get("user_id"):
+        settle_subscription(
+            metadata["user_id"],
+            metadata.get("plan"),
+            event.reference
+        )
+        return True
+
+    return False
+
+
+def _record(event, error=None, handled=True):
+    event.attempts += 1
+
+    if error is None:
+        event.status = "processed" if handled else "ignored"
+        event.last_error = ""
+        event.processed_at = timezone.now()
+
+    else:
+        event.last_error = error[:1000]
+        schedule_retry(event)
+
+    event.save(update_fields=[
+        "attempts", "status", "last_error", "processed_at",
+        "next_attempt_at", "updated_at"
+    ])
+
+
+def process_events(batch_size=50):
+    """
+    Returns (claimed, processed).
+    """
+    events = claim(PaystackEvent.objects.all(), batch_size)
+    processed = 0
+
+    for event in events:
+        try:
+            handled = apply_event(event)
+        except Exception as e:
+            _record(event, error=str(e) or e.__class__.__name__)
+            continue
+
+        _record(event, handled=handled)
+        processed += 1
+
+    return len(events), processed
@@ -0,0 +1,196 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from ..models import Item, Store
+
+
+# Upper bound on ranked ids returned for one query.
+MAX_RESULTS = 1000
+
+
+def _terms(query):
+    """
+    'Red  sneakers!' -> ['red', 'sneakers']
+    """
+    return re.findall(r"\w+", (query or "").lower())
+
+
+# =========================
+# 1. BACKENDS
+# =========================
+
+class BasicSearchBackend:
+    """
+    icontains fallback for databases without a full-text index.
+    Newest first; no ranking.
+    """
+
+    def search_items(self, query, store_id=None, limit=MAX_RESULTS):
+        qs = Item.objects.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+        if store_id:
+            qs = qs.filter(store_id=store_id)
+
+        return list(
+            qs.order_by("-created_at").values_list("id", flat=True)[:limit]
+        )
+
+    def search_stores(self, query, limit=MAX_RESULTS):
+        return list(
+            Store.objects.filter(
+                Q(brand_name__icontains=query) | Q(bio__icontains=query)
+            ).order_by("id").values_list("id", flat=True)[:limit]
+        )
+
+
+class MySQLSearchBackend:
+    """
+    InnoDB FULLTEXT indexes (migration 0037), ranked by relevance.
+    """
+
+    ITEM_MATCH = "MATCH (app_item.name, app_item.description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    STORE_MATCH = "MATCH (app_store.brand_name, app_store.bio) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+
+    def _ranked(self, qs, match, query, limit):
+        return list(
+            qs.annotate(score=RawSQL(match, (query,)))
+            .filter(score__gt=0)
+            .order_by("-score", "-id")
+            .values_list("id", flat=True)[:limit]
+        )
+
+    def search_items(self, query, store_id=None, limit=MAX_RESULTS):
+        qs = Item.objects.all()
+        if store_id:
+            qs = qs.filter(store_id=store_id)
+
+        return self._ranked(qs, self.ITEM_MATCH, query, limit)
+
+    def search_stores(self, query, limit=MAX_RESULTS):
+        return self._ranked(Store.objects.all(), self.STORE_MATCH, query, limit)
+
+
+class SQLiteSearchBackend:
+    """
+    FTS5 tables mirroring app_item / app_store, kept in sync by triggers.
+    Created on first use, so local and test databases need no migration
+    (and a rolled-back test transaction simply recreates them).
+    """
+
+    TABLES = {
+        "app_item_fts": ("app_item", ["name", "description"]),
+        "app_store_fts": ("app_store", ["brand_name", "bio"]),
+    }
+
+    def _ensure_tables(self):
+        with connection.cursor() as cursor:
+            for fts, (table, columns) in self.TABLES.items():
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = %s", [fts]
+                )
+                if cursor.fetchone():
+                    continue
+
+                cols = ", ".join(columns)
+                new_cols = ", ".join(f"new.{c}" for c in columns)
+                old_cols = ", ".join(f"old.{c}" for c in columns)
+
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                    f"{cols}, content='{table}', content_rowid='id')"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+                    f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+                )
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def _ranked(self, fts, table, query, limit, store_id=None):
+        terms = _terms(query)
+        if not terms:
+            return []
+
+        self._ensure_tables()
+
+        # Every term must match, each as a prefix
+        match = " ".join(f'"{term}"*' for term in terms)
+
+        sql = f"SELECT {fts}.rowid FROM {fts}"
+        params = [match]
+        where = f" WHERE {fts} MATCH %s"
+
+        if store_id:
+            sql += f" JOIN {table} ON {table}.id = {fts}.rowid"
+            where += f" AND {table}.store_id = %s"
+            params.append(store_id)
+
+        sql += where + f" ORDER BY bm25({fts}) LIMIT %s"
+        params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def search_items(self, query, store_id=None, limit=MAX_RESULTS):
+        return self._ranked("app_item_fts", "app_item", query, limit, store_id)
+
+    def search_stores(self, query, limit=MAX_RESULTS):
+        return self._ranked("app_store_fts", "app_store", query, limit)
+
+
+# =========================
+# 2. BACKEND SELECTION
+# =========================
+
+BACKENDS = {
+    "mysql": MySQLSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+    "basic": BasicSearchBackend,
+}
+
+_backend = {}
+
+
+def get_backend():
+    """
+    settings.SEARCH_BACKEND ("mysql", "sqlite" or "basic"), or the one
+    matching the database in use.
+    """
+    name = getattr(settings, "SEARCH_BACKEND", None) or connection.vendor
+
+    if name not in _backend:
+        _backend[name] = BACKENDS.get(name, BasicSearchBackend)()
+
+    return _backend[name]
+
+
+def search_items(query, store_id=None, limit=MAX_RESULTS):
+    """
+    Ranked item ids (best first) for `query`, optionally within one store.
+    """
+    if not (query or "").strip():
+        return []
+    return get_backend().search_items(query.strip(), store_id=store_id, limit=limit)
+
+
+def search_stores(query, limit=MAX_RESULTS):
+    """
+    Ranked store ids (best first) for `query`.
+    """
+    if not (query or "").strip():
+        return []
+    return get_backend().search_stores(query.strip(), limit=limit)
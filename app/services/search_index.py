@@ -0,0 +1,184 @@
+import re
+import threading
+import time
+
+from django.core.cache import cache
+from rapidfuzz import process
+
+from ..models import Item, Store
+
+
+# How often a worker checks whether another worker changed an index.
+VERSION_CHECK_INTERVAL = 30
+
+
+def normalize_name(name):
+    """
+    '  Red   SNEAKERS ' -> 'red sneakers'
+    """
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+# =========================
+# 1. INDEX
+# =========================
+
+class FuzzyIndex:
+    """
+    Per-worker list of normalized names and the ids they belong to,
+    kept in the same order so a match position maps straight to an id.
+    """
+
+    def __init__(self, model, field, version_key):
+        self.model = model
+        self.field = field
+        self.version_key = version_key
+
+        self.ids = []
+        self.names = []
+        self._positions = {}  # id -> position in ids/names
+
+        self._lock = threading.Lock()
+        self._state = {
+            "loaded": False,
+            "version": None,
+            "checked_at": 0.0,
+        }
+
+    # ---------- loading ----------
+
+    def load(self):
+        """
+        Full rebuild: one query over (id, name).
+        """
+        rows = self.model.objects.values_list("id", self.field).order_by("id")
+
+        ids = []
+        names = []
+        for obj_id, name in rows:
+            ids.append(obj_id)
+            names.append(normalize_name(name))
+
+        with self._lock:
+            self.ids = ids
+            self.names = names
+            self._positions = {obj_id: i for i, obj_id in enumerate(ids)}
+            self._state["loaded"] = True
+            self._state["version"] = cache.get(self.version_key)
+            self._state["checked_at"] = time.monotonic()
+
+    def _ensure_fresh(self):
+        if not self._state["loaded"]:
+            self.load()
+            return
+
+        now = time.monotonic()
+
+        if now - self._state["checked_at"] < VERSION_CHECK_INTERVAL:
+            return
+
+        self._state["checked_at"] = now
+
+        if cache.get(self.version_key) != self._state["version"]:
+            self.load()
+
+    # ---------- incremental updates ----------
+
+    def _bump_version(self):
+        """
+        Tells the other workers to reload. The version is a counter: if
+        our bump is the only one since this worker last loaded, the
+        change is already applied here and is recorded as seen. If
+        another worker bumped it meanwhile, the local version is left
+        alone so that change still gets loaded.
+        """
+        cache.add(self.version_key, 0, None)
+
+        try:
+            version = cache.incr(self.version_key)
+        except ValueError:
+            # Evicted between add and incr; the next check reloads
+            return
+
+        with self._lock:
+            if self._state["loaded"] and version - 1 == (self._state["version"] or 0):
+                self._state["version"] = version
+
+    def upsert(self, obj_id, name):
+        """
+        Called from the model's save().
+        """
+        if self._state["loaded"]:
+            with self._lock:
+                position = self._positions.get(obj_id)
+
+                if position is None:
+                    self._positions[obj_id] = len(self.ids)
+                    self.ids.append(obj_id)
+                    self.names.append(normalize_name(name))
+                else:
+                    self.names[position] = normalize_name(name)
+
+        self._bump_version()
+
+    def remove(self, obj_id):
+        """
+        Called from the model's delete(). The last entry is moved into
+        the freed slot so removal stays O(1).
+        """
+        if self._state["loaded"]:
+            with self._lock:
+                position = self._positions.pop(obj_id, None)
+
+                if position is not None:
+                    last_id = self.ids.pop()
+                    last_name = self.names.pop()
+
+                    if last_id != obj_id:
+                        self.ids[position] = last_id
+                        self.names[position] = last_name
+                        self._positions[last_id] = position
+
+        self._bump_version()
+
+    # ---------- query ----------
+
+    def search(self, query, limit=10, score_cutoff=60):
+        """
+        Ids of the best fuzzy matches, best first. No database access
+        once the index is loaded.
+        """
+        query = normalize_name(query)
+
+        if not query:
+            return []
+
+        self._ensure_fresh()
+
+        # Match against a snapshot, so searches don't wait for each other
+        # and saves don't shift positions mid-match
+        with self._lock:
+            ids = list(self.ids)
+            names = list(self.names)
+
+        matches = process.extract(
+            query,
+            names,
+            limit=limit,
+            score_cutoff=score_cutoff,
+        )
+
+        return [ids[position] for _name, _score, position in matches]
+
+
+# =========================
+# 2. INDEXES
+# =========================
+
+product_index = FuzzyIndex(Item, "name", "search_index:items:version")
+store_index = FuzzyIndex(Store, "brand_name", "search_index:stores:version")
+
+
+def load_indexes():
+    product_index.load()
+    store_index.load()
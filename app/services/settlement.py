@@ -0,0 +1,115 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Order, Payment, PaymentHistory, Subscription
+
+from .wallet_service import process_paid_order
+
+
+# =========================
+# SETTLEMENT
+# =========================
+#
+# One place that applies a successful Paystack charge, shared by the
+# browser callbacks and the webhook worker. Both may see the same
+# payment, in any order and at the same time, so each function locks
+# the row it changes and does nothing if the payment is already applied.
+
+
+class SettlementError(Exception):
+    pass
+
+
+def settle_order(reference, data, order_id=None):
+    """
+    Marks the order paid and credits the seller (process_paid_order).
+    Returns (order, settled_now); settled_now is False if the order was
+    already settled. `data` is the Paystack transaction (verify response
+    or webhook payload).
+    """
+    with transaction.atomic():
+        orders = Order.objects.select_for_update()
+
+        if order_id:
+            order = orders.get(id=order_id)
+        else:
+            order = orders.get(paystack_reference=reference)
+
+        if order.status != "PENDING_PAYMENT":
+            return order, False
+
+        paid = Decimal(data.get("amount") or 0) / 100
+        if paid < order.amount:
+            raise SettlementError(
+                f"Paid {paid} for order {order.order_id} of {order.amount}"
+            )
+
+        order.status = "PAID"
+        order.paystack_reference = reference
+        order.save()
+
+        PaymentHistory.objects.get_or_create(
+            reference=reference,
+            defaults={
+                "user": order.seller,
+                "amount": order.amount,
+                "plan": "store_order",
+                "status": "success",
+                "paystack_response": data,
+            },
+        )
+
+        process_paid_order(order)
+
+    return order, True
+
+
+def settle_subscription(user_id, plan, reference):
+    """
+    Activates (or extends) the user's subscription for this payment.
+    Returns (subscription, settled_now).
+    """
+    with transaction.atomic():
+        payment = (
+            Payment.objects
+            .select_for_update()
+            .filter(reference=reference)
+            .first()
+        )
+
+        sub, _ = (
+            Subscription.objects
+            .select_for_update()
+            .get_or_create(user_id=user_id)
+        )
+
+        if (
+            (payment and payment.status == "success")
+            or sub.last_payment_reference == reference
+        ):
+            return sub, False
+
+        sub.is_active = True
+        sub.started_at = timezone.now()
+
+        if plan == "premium_yearly":
+            sub.plan = "premium_yearly"
+            sub.expires_at = timezone.now() + timedelta(days=365)
+
+        else:
+            sub.plan = "premium_monthly"
+            sub.expires_at = timezone.now() + timedelta(days=30)
+
+        sub.last_payment_reference = reference
+
+        sub.save()
+
+        if payment:
+            payment.status = "success"
+            payment.paid_at = timezone.now()
+            payment.save()
+
+    return sub, True
@@ -0,0 +1,143 @@
+import copy
+import threading
+import time
+
+from django.core.cache import cache
+
+from ..models import Store
+
+
+# =========================
+# 1. CACHE SETTINGS
+# =========================
+
+# How long a worker trusts its own copy before asking the shared cache again.
+LOCAL_TTL = 30
+
+# How long the shared (Django) cache keeps a resolved store.
+SHARED_TTL = 300
+
+# Unknown subdomains are remembered for a shorter time so a newly
+# created store shows up quickly even on workers that missed the save.
+NEGATIVE_TTL = 60
+
+# Marker stored for lookups that don't match any store.
+MISSING = "__missing__"
+
+_local = {}
+_lock = threading.Lock()
+
+
+def _cache_key(key):
+    return f"store:{key}"
+
+
+# =========================
+# 2. LOOKUPS
+# =========================
+
+def _get_local(key):
+    entry = _local.get(key)
+
+    if not entry:
+        return None
+
+    expires_at, value = entry
+
+    if expires_at < time.monotonic():
+        with _lock:
+            _local.pop(key, None)
+        return None
+
+    return value
+
+
+def _set_local(key, value, ttl):
+    with _lock:
+        _local[key] = (time.monotonic() + ttl, value)
+
+
+def _get_store(key, **lookup):
+    value = _get_local(key)
+
+    if value is None:
+        value = cache.get(_cache_key(key))
+
+        if value is None:
+            value = (
+                Store.objects
+                .select_related("template")
+                .filter(**lookup)
+                .first()
+            ) or MISSING
+
+            cache.set(
+                _cache_key(key),
+                value,
+                NEGATIVE_TTL if value == MISSING else SHARED_TTL
+            )
+
+        _set_local(
+            key,
+            value,
+            min(LOCAL_TTL, NEGATIVE_TTL) if value == MISSING else LOCAL_TTL
+        )
+
+    if value == MISSING:
+        return None
+
+    # Views mutate the store (view counters etc.), so never hand out
+    # the cached instance itself.
+    return copy.copy(value)
+
+
+def get_store_by_slug(slug):
+    """
+    Returns the Store for this slug, or None if no store uses it.
+    Checks worker memory first, then the shared cache, then MySQL.
+    Both hits and misses are cached.
+    """
+    if not slug:
+        return None
+
+    return _get_store(f"slug:{slug}", slug=slug)
+
+
+def get_store_by_id(store_id):
+    """
+    Same as get_store_by_slug(), keyed by primary key.
+    Used for custom-domain routing.
+    """
+    if not store_id:
+        return None
+
+    return _get_store(f"id:{store_id}", pk=store_id)
+
+
+# =========================
+# 3. INVALIDATION
+# =========================
+
+def _invalidate(key):
+    with _lock:
+        _local.pop(key, None)
+
+    cache.delete(_cache_key(key))
+
+
+def invalidate_store(store_id, *slugs):
+    """
+    Drops cached entries for this store and these slugs (positive or
+    negative). Called from Store.save() and Store.delete().
+    """
+    if store_id:
+        _invalidate(f"id:{store_id}")
+
+    for slug in slugs:
+        if slug:
+            _invalidate(f"slug:{slug}")
+
+
+def clear_local_cache():
+    with _lock:
+        _local.clear()
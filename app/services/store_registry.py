@@ -0,0 +1,131 @@
+import time
+
+from django.utils.functional import cached_property
+
+from ..models import Store
+
+
+# =========================
+# 1. SESSION KEYS
+# =========================
+
+ACTIVE_STORE_KEY = "active_store_id"
+STORE_IDS_KEY = "user_store_ids"
+STORE_IDS_AT_KEY = "user_store_ids_at"
+
+# Stores can be created from another device, so the cached id list
+# is re-checked every few minutes even without an explicit invalidation.
+STORE_IDS_TTL = 5 * 60
+
+
+# =========================
+# 2. REGISTRY
+# =========================
+
+class StoreRegistry:
+    """
+    The logged-in user's stores, loaded at most once per request and
+    shared by the user_store context processor and the views.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.user = request.user
+
+    def _cached_ids(self):
+        session = self.request.session
+
+        checked_at = session.get(STORE_IDS_AT_KEY)
+
+        if checked_at is None or time.time() - checked_at > STORE_IDS_TTL:
+            return None
+
+        return session.get(STORE_IDS_KEY)
+
+    @cached_property
+    def stores(self):
+        """
+        All of the user's stores ordered by id. Users the session already
+        knows have no stores (most buyers) cost zero queries.
+        """
+        if not self.user.is_authenticated:
+            return []
+
+        if self._cached_ids() == []:
+            return []
+
+        stores = list(
+            Store.objects
+            .filter(owner=self.user)
+            .select_related("template")
+            .order_by("id")
+        )
+
+        ids = [s.id for s in stores]
+
+        if self.request.session.get(STORE_IDS_KEY) != ids:
+            self.request.session[STORE_IDS_KEY] = ids
+
+        if self._cached_ids() is None:
+            self.request.session[STORE_IDS_AT_KEY] = time.time()
+
+        return stores
+
+    @property
+    def first_store(self):
+        return self.stores[0] if self.stores else None
+
+    @cached_property
+    def active_store(self):
+        """
+        The store picked in the session, falling back to the first store.
+        """
+        active_store = self.get(self.request.session.get(ACTIVE_STORE_KEY))
+
+        if not active_store:
+            active_store = self.first_store
+
+            if active_store:
+                self.request.session[ACTIVE_STORE_KEY] = active_store.id
+
+        return active_store
+
+    def get(self, store_id):
+        for store in self.stores:
+            if str(store.id) == str(store_id):
+                return store
+        return None
+
+    def get_by_slug(self, slug):
+        for store in self.stores:
+            if store.slug == slug:
+                return store
+        return None
+
+
+def get_store_registry(request):
+    """
+    Returns the registry for this request, creating it on first use.
+    """
+    registry = getattr(request, "_store_registry", None)
+
+    if registry is None:
+        registry = StoreRegistry(request)
+        request._store_registry = registry
+
+    return registry
+
+
+# =========================
+# 3. INVALIDATION
+# =========================
+
+def invalidate_user_stores(request):
+    """
+    Call after a store is created, deleted or switched.
+    """
+    request.session.pop(STORE_IDS_KEY, None)
+    request.session.pop(STORE_IDS_AT_KEY, None)
+
+    if hasattr(request, "_store_registry"):
+        del request._store_registry
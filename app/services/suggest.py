@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+
+from ..models import Item, Store
+from .search_index import VERSION_CHECK_INTERVAL, normalize_name, product_index, store_index
+
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+TOP_N = 8
+
+# Only the first characters of each word are indexed; longer
+# prefixes are answered from the deepest node.
+MAX_PREFIX = 20
+
+# Words after this are not indexed as separate entry points.
+MAX_WORDS = 4
+
+HOT_PREFIXES = 2048
+
+
+# =========================
+# 2. TRIE
+# =========================
+
+class PrefixTrie:
+    """
+    Each node keeps its own top-N suggestions, so a lookup is a walk
+    down len(prefix) dicts and no scan of the subtree.
+    """
+
+    def __init__(self, top_n=TOP_N):
+        self.top_n = top_n
+        self.root = {"children": {}, "top": []}
+
+    def _keep(self, node, entry):
+        top = node["top"]
+
+        if entry in top:
+            return
+
+        if len(top) < self.top_n:
+            top.append(entry)
+        elif entry[0] > top[-1][0]:
+            top[-1] = entry
+        else:
+            return
+
+        top.sort(key=lambda e: e[0], reverse=True)
+
+    def insert(self, label, suggestion, rank=0):
+        """
+        Indexes `label` from the start of each of its first MAX_WORDS
+        words, so 'red running shoes' is found by 'run' and 'sho' too.
+        """
+        words = normalize_name(label).split(" ")
+        entry = (rank, suggestion)
+
+        for i in range(min(len(words), MAX_WORDS)):
+            text = " ".join(words[i:])[:MAX_PREFIX]
+
+            node = self.root
+            for char in text:
+                node = node["children"].setdefault(
+                    char, {"children": {}, "top": []}
+                )
+                self._keep(node, entry)
+
+    def lookup(self, prefix):
+        node = self.root
+
+        for char in normalize_name(prefix)[:MAX_PREFIX]:
+            node = node["children"].get(char)
+            if node is None:
+                return []
+
+        return [suggestion for _rank, suggestion in node["top"]]
+
+
+# =========================
+# 3. WORKER STATE
+# =========================
+
+_lock = threading.Lock()
+
+_state = {
+    "global": None,      # PrefixTrie of marketplace products and stores
+    "stores": {},        # store_id -> PrefixTrie of that store's products
+    "versions": None,
+    "checked_at": 0.0,
+    "rebuilding": False,
+}
+
+# (store_id or None, prefix) -> suggestions, most recently used last
+_hot = OrderedDict()
+
+
+def _versions():
+    return (
+        cache.get(product_index.version_key),
+        cache.get(store_index.version_key),
+    )
+
+
+def build():
+    """
+    Full rebuild: one query for stores, one for items.
+    """
+    global_trie = PrefixTrie()
+    store_tries = {}
+
+    stores = {}
+    for store_id, brand_name, slug, is_demo, views in Store.objects.values_list(
+        "id", "brand_name", "slug", "is_demo", "total_views"
+    ):
+        stores[store_id] = (slug, is_demo)
+
+        if not is_demo:
+            global_trie.insert(
+                brand_name,
+                (
+                    "store",
+                    brand_name,
+                    Store(slug=slug).get_absolute_url(),
+                ),
+                rank=views or 0,
+            )
+
+    for name, slug, store_id, views in Item.objects.values_list(
+        "name", "slug", "store_id", "views"
+    ):
+        store_slug, is_demo = stores.get(store_id, (None, True))
+        if not store_slug or not slug:
+            continue
+
+        suggestion = (
+            "product",
+            name,
+            reverse(
+                "store_product_detail",
+                kwargs={"store_slug": store_slug, "product_slug": slug},
+            ),
+        )
+
+        store_tries.setdefault(store_id, PrefixTrie()).insert(
+            name, suggestion, rank=views or 0
+        )
+
+        if not is_demo:
+            global_trie.insert(name, suggestion, rank=views or 0)
+
+    with _lock:
+        _state["global"] = global_trie
+        _state["stores"] = store_tries
+        _state["versions"] = _versions()
+        _state["checked_at"] = time.monotonic()
+        _hot.clear()
+
+
+def _rebuild():
+    try:
+        build()
+    except Exception:
+        logger.exception("Suggestion trie rebuild failed")
+    finally:
+        _state["rebuilding"] = False
+        connection.close()
+
+
+def _rebuild_in_background():
+    """
+    One rebuild per worker at a time, in a thread; lookups keep using
+    the current trie until the new one is swapped in.
+    """
+    with _lock:
+        if _state["rebuilding"]:
+            return
+        _state["rebuilding"] = True
+
+    threading.Thread(target=_rebuild, daemon=True).start()
+
+
+def _ensure_fresh():
+    """
+    Rebuilds when an Item or Store changed anywhere (the search index
+    version keys), checked at most every VERSION_CHECK_INTERVAL seconds.
+    Only a worker with no trie at all builds on the request path.
+    """
+    if _state["global"] is None:
+        build()
+        return
+
+    now = time.monotonic()
+
+    if now - _state["checked_at"] < VERSION_CHECK_INTERVAL:
+        return
+
+    _state["checked_at"] = now
+
+    if _versions() != _state["versions"]:
+        _rebuild_in_background()
+
+
+# =========================
+# 4. LOOKUP (HOT PATH)
+# =========================
+
+def suggest(prefix, store_id=None, limit=TOP_N):
+    """
+    [{"type", "name", "url"}, ...] for the prefix, best first.
+    Scoped to one store's products when store_id is given.
+    """
+    prefix = normalize_name(prefix)
+
+    if not prefix:
+        return []
+
+    _ensure_fresh()
+
+    key = (store_id, prefix)
+
+    with _lock:
+        if key in _hot:
+            _hot.move_to_end(key)
+            return _hot[key][:limit]
+
+        if store_id:
+            trie = _state["stores"].get(store_id)
+        else:
+            trie = _state["global"]
+
+        results = [
+            {"type": kind, "name": name, "url": url}
+            for kind, name, url in (trie.lookup(prefix) if trie else [])
+        ]
+
+        _hot[key] = results
+        if len(_hot) > HOT_PREFIXES:
+            _hot.popitem(last=False)
+
+    return results[:limit]
@@ -0,0 +1,173 @@
+from app.models import Item, MediaUpload, StoreImage
+from app.utils import upload_many_to_imgbb
+
+from .work_queue import claim, schedule_retry
+
+
+# =========================
+# 1. QUEUEING (REQUEST PATH)
+# =========================
+
+def queue_item_image(item):
+    """
+    item.image is already saved locally and serves as the cover
+    until the ImgBB copy is ready.
+    """
+    return MediaUpload.objects.create(
+        store_id=item.store_id,
+        kind="item_image",
+        item=item,
+    )
+
+
+def queue_store_image(store_image):
+    return MediaUpload.objects.create(
+        store_id=store_image.store_id,
+        kind="store_image",
+        store_image=store_image,
+    )
+
+
+# =========================
+# 2. WORKER
+# =========================
+
+def _local_file(upload):
+    if upload.kind == "item_image":
+        return upload.item.image
+    return upload.store_image.image
+
+
+def _finish(upload, url):
+    """
+    Points the target at the ImgBB copy and drops the local file.
+
+    The target is re-read so edits the seller made during the upload
+    are kept, and only image/image_url are written. If the seller
+    replaced the picture meanwhile, the new one has its own upload and
+    this URL is dropped.
+    """
+    uploaded_name = _local_file(upload).name
+
+    if upload.kind == "item_image":
+        target = Item.objects.get(pk=upload.item_id)
+    else:
+        target = StoreImage.objects.get(pk=upload.store_image_id)
+
+    if target.image.name != uploaded_name:
+        return
+
+    target.image_url = url
+
+    if target.image:
+        target.image.delete(save=False)
+
+    target.save(update_fields=["image_url", "image"])
+
+
+def _record(upload, url, error):
+    upload.attempts += 1
+
+    if url:
+        try:
+            _finish(upload, url)
+        except Exception as e:
+            url, error = None, str(e)
+
+    if url:
+        upload.status = "done"
+        upload.remote_url = url
+        upload.last_error = ""
+        upload.save(update_fields=[
+            "attempts", "last_error", "status", "remote_url", "updated_at"
+        ])
+        return True
+
+    upload.last_error = (error or "ImgBB upload failed")[:1000]
+    schedule_retry(upload)
+
+    upload.save(update_fields=[
+        "attempts", "last_error", "status", "next_attempt_at", "updated_at"
+    ])
+    return False
+
+
+def run_uploads(uploads):
+    """
+    Uploads the given (claimed) uploads concurrently, then records each
+    result. Returns the number that succeeded.
+    """
+    ready = []
+    succeeded = 0
+
+    for upload in uploads:
+        local = _local_file(upload)
+
+        if local:
+            ready.append((upload, local))
+        else:
+            _record(upload, None, "Local file is missing")
+
+    opened = [local.open("rb") for _upload, local in ready]
+
+    try:
+        results = upload_many_to_imgbb(opened)
+    finally:
+        for f in opened:
+            f.close()
+
+    for (upload, _local), result in zip(ready, results):
+        if _record(upload, result["url"], result["error"]):
+            succeeded += 1
+
+    return succeeded
+
+
+def process_uploads(batch_size=20):
+    """
+    Returns (claimed, succeeded).
+    """
+    uploads = claim(MediaUpload.objects.all(), batch_size)
+
+    return len(uploads), run_uploads(uploads)
+
+
+def process_now(uploads):
+    """
+    Synchronous path (MEDIA_UPLOADS_ASYNC = False): upload right away,
+    still concurrently. Whatever fails stays queued for process_uploads.
+    """
+    MediaUpload.objects.filter(
+        id__in=[u.id for u in uploads]
+    ).update(status="processing")
+
+    return run_uploads(uploads)
+
+
+# =========================
+# 3. STATUS
+# =========================
+
+def upload_status(store):
+    """
+    What the dashboard polls: counts plus every upload not yet done.
+    """
+    open_uploads = list(
+        MediaUpload.objects
+        .filter(store=store)
+        .exclude(status="done")
+        .order_by("id")
+        .values(
+            "id", "kind", "item_id", "store_image_id",
+            "status", "attempts", "last_error",
+        )
+    )
+
+    counts = {"pending": 0, "processing": 0, "failed": 0}
+    for upload in open_uploads:
+        counts[upload["status"]] += 1
+
+    return {
+        **counts,
+        "uploads": open_uploads,
+    }
@@ -0,0 +1,310 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import ProductMedia, VideoUpload
+from app.utils import YouTubeQuotaExceeded, upload_to_youtube
+
+from .work_queue import MAX_ATTEMPTS, claim, schedule_retry
+from .youtube_quota import mark_exhausted, next_reset, reserve_upload, uploads_left
+
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+READ_CHUNK = 64 * 1024
+
+# Uploads never finished, or finished but never attached to a product,
+# are deleted after this.
+ABANDONED_AFTER = timedelta(days=1)
+
+
+class UploadError(Exception):
+    """
+    A request the upload can't accept; `status` is the HTTP status.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def spool_path(upload):
+    return os.path.join(settings.VIDEO_UPLOAD_DIR, f"{upload.token.hex}.part")
+
+
+def _discard_file(upload):
+    try:
+        os.remove(spool_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+# =========================
+# 2. RECEIVING (REQUEST PATH)
+# =========================
+
+def create_upload(store, size, filename="", content_type=""):
+    """
+    Starts an upload of `size` bytes with an empty spool file.
+    """
+    if size <= 0:
+        raise UploadError("Upload-Length must be a positive number of bytes")
+
+    if size > settings.VIDEO_UPLOAD_MAX_SIZE:
+        raise UploadError("Video is too large", status=413)
+
+    if content_type and not content_type.startswith("video/"):
+        raise UploadError("Only video files can be uploaded here", status=415)
+
+    upload = VideoUpload.objects.create(
+        store=store,
+        size=size,
+        filename=filename[:255],
+        content_type=content_type[:100],
+    )
+
+    os.makedirs(settings.VIDEO_UPLOAD_DIR, exist_ok=True)
+    open(spool_path(upload), "wb").close()
+
+    return upload
+
+
+def append_chunk(upload, offset, stream):
+    """
+    Appends the request body to the spool file at `offset`, which must
+    be what the server already has (the client learns it with HEAD).
+
+    Whatever arrives before a dropped connection is kept, so the client
+    resumes from there. The row lock serialises two requests racing for
+    the same upload. Returns the updated upload.
+    """
+    with transaction.atomic():
+        upload = VideoUpload.objects.select_for_update().get(pk=upload.pk)
+
+        if upload.status != "receiving":
+            raise UploadError("Upload is already complete", status=409)
+
+        if offset != upload.offset:
+            raise UploadError(
+                f"Upload-Offset {offset} does not match {upload.offset}",
+                status=409
+            )
+
+        remaining = upload.size - upload.offset
+
+        with open(spool_path(upload), "r+b") as f:
+            # Drop any bytes past the offset left by an interrupted write
+            f.seek(upload.offset)
+            f.truncate()
+
+            try:
+                while remaining > 0:
+                    chunk = stream.read(min(READ_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            except OSError:
+                # Connection dropped mid-chunk; keep what arrived
+                pass
+
+            f.flush()
+            upload.offset = f.tell()
+
+        if upload.offset >= upload.size:
+            upload.status = "pending" if upload.item_id else "received"
+
+        upload.save(update_fields=["offset", "status", "updated_at"])
+
+    return upload
+
+
+def attach_uploads(product, tokens):
+    """
+    Links finished uploads (tokens posted with the product form) to the
+    product and queues them for YouTube. Returns how many were queued.
+    """
+    queued = 0
+
+    for upload in VideoUpload.objects.filter(
+        store_id=product.store_id,
+        token__in=[t for t in tokens if t],
+        item__isnull=True,
+    ):
+        upload.item = product
+
+        if upload.status == "received":
+            upload.status = "pending"
+            queued += 1
+
+        upload.save(update_fields=["item", "status", "updated_at"])
+
+    return queued
+
+
+# =========================
+# 3. WORKER
+# =========================
+
+def _report_progress(upload):
+    def on_progress(percent):
+        # Also keeps updated_at fresh, so a long upload isn't seen as stale
+        VideoUpload.objects.filter(pk=upload.pk).update(
+            progress=percent,
+            updated_at=timezone.now()
+        )
+
+    return on_progress
+
+
+def _finish(upload, youtube_id):
+    product = upload.item
+
+    with transaction.atomic():
+        ProductMedia.objects.create(
+            product=product,
+            youtube_id=youtube_id,
+            youtube_url=f"https://www.youtube.com/watch?v={youtube_id}",
+            label=product.name,
+            description=product.description or ""
+        )
+
+        upload.status = "done"
+        upload.progress = 100
+        upload.youtube_id = youtube_id
+        upload.last_error = ""
+        upload.save(update_fields=[
+            "attempts", "status", "progress", "youtube_id",
+            "last_error", "updated_at"
+        ])
+
+    _discard_file(upload)
+
+
+def _fail(upload, error):
+    upload.last_error = (error or "YouTube upload failed")[:1000]
+
+    if schedule_retry(upload):
+        _discard_file(upload)
+
+    upload.save(update_fields=[
+        "attempts", "last_error", "status", "next_attempt_at", "updated_at"
+    ])
+
+
+def _defer(upload, reason):
+    """
+    Out of quota: wait for the reset without using up an attempt.
+    """
+    upload.status = "pending"
+    upload.last_error = reason[:1000]
+    upload.next_attempt_at = next_reset()
+    upload.save(update_fields=[
+        "last_error", "status", "next_attempt_at", "updated_at"
+    ])
+
+
+def send_to_youtube(upload):
+    """
+    Uploads one claimed upload and records the result.
+    Returns True on success.
+    """
+    path = spool_path(upload)
+
+    if not os.path.exists(path):
+        upload.attempts = MAX_ATTEMPTS
+        _fail(upload, "Uploaded file is missing")
+        return False
+
+    if not reserve_upload():
+        _defer(upload, "Daily YouTube quota used up; waiting for the reset")
+        return False
+
+    upload.attempts += 1
+
+    try:
+        response = upload_to_youtube(
+            path,
+            title=upload.item.name or "Untitled Product",
+            description=upload.item.description or "",
+            on_progress=_report_progress(upload),
+        )
+        _finish(upload, response["id"])
+        return True
+
+    except YouTubeQuotaExceeded as e:
+        mark_exhausted()
+        upload.attempts -= 1
+        _defer(upload, str(e))
+        return False
+
+    except Exception as e:
+        _fail(upload, str(e))
+        return False
+
+
+def process_video_uploads(batch_size=5):
+    """
+    Returns (claimed, succeeded). Claims no more uploads than today's
+    YouTube quota can take; the rest stay queued for after the reset.
+    """
+    batch_size = min(batch_size, uploads_left())
+
+    if not batch_size:
+        return 0, 0
+
+    uploads = claim(
+        VideoUpload.objects.select_related("item"),
+        batch_size,
+        progress=0,
+    )
+
+    succeeded = sum(1 for upload in uploads if send_to_youtube(upload))
+
+    return len(uploads), succeeded
+
+
+def expire_abandoned():
+    """
+    Deletes uploads (and their spool files) that never completed or were
+    never attached to a product. Returns how many were removed.
+    """
+    abandoned = list(
+        VideoUpload.objects.filter(
+            status__in=["receiving", "received"],
+            updated_at__lt=timezone.now() - ABANDONED_AFTER,
+        )
+    )
+
+    for upload in abandoned:
+        _discard_file(upload)
+
+    VideoUpload.objects.filter(id__in=[u.id for u in abandoned]).delete()
+
+    return len(abandoned)
+
+
+# =========================
+# 4. STATUS
+# =========================
+
+def video_status(upload):
+    return {
+        "id": str(upload.token),
+        "status": upload.status,
+        "offset": upload.offset,
+        "size": upload.size,
+        "progress": upload.progress,
+        "youtube_id": upload.youtube_id,
+        "error": upload.last_error,
+        "retry_at": (
+            upload.next_attempt_at.isoformat()
+            if upload.status == "pending" and upload.next_attempt_at > timezone.now()
+            else None
+        ),
+    }
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+
+# =========================
+# 1. SETTINGS
+# =========================
+
+# Shared by the database-backed queues (MediaUpload, VideoUpload,
+# PaystackEvent): rows with status / attempts / next_attempt_at /
+# updated_at, worked through by cron commands.
+
+MAX_ATTEMPTS = 5
+
+# Retry after 1, 2, 4, 8... minutes
+BACKOFF_BASE = 60
+
+# A "processing" row older than this is assumed to belong to a worker
+# that died, and is picked up again.
+STALE_AFTER = timedelta(minutes=15)
+
+
+# =========================
+# 2. CLAIMING
+# =========================
+
+def claim(queryset, batch_size, **processing):
+    """
+    Locks up to batch_size due "pending" rows and up to batch_size stale
+    "processing" ones (skipping rows another worker holds), marks them
+    "processing" and returns them. `processing` are extra fields to
+    reset on the claimed rows (e.g. progress=0).
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(
+            queryset
+            .select_for_update(skip_locked=True)
+            .filter(
+                status="pending",
+                next_attempt_at__lte=now,
+            )
+            .order_by("id")[:batch_size]
+        )
+
+        stale = list(
+            queryset
+            .select_for_update(skip_locked=True)
+            .filter(
+                status="processing",
+                updated_at__lt=now - STALE_AFTER,
+            )
+            .order_by("id")[:batch_size]
+        )
+
+        rows += stale
+
+        queryset.model.objects.filter(
+            id__in=[row.id for row in rows]
+        ).update(status="processing", updated_at=now, **processing)
+
+    return rows
+
+
+# =========================
+# 3. RETRIES
+# =========================
+
+def schedule_retry(row):
+    """
+    After a failed attempt (row.attempts already counted): back to
+    "pending" with exponential backoff, or "failed" once MAX_ATTEMPTS is
+    reached. Doesn't save. Returns True if the row gave up.
+    """
+    if row.attempts >= MAX_ATTEMPTS:
+        row.status = "failed"
+        return True
+
+    row.status = "pending"
+    row.next_attempt_at = timezone.now() + timedelta(
+        seconds=BACKOFF_BASE * 2 ** (row.attempts - 1)
+    )
+    return False
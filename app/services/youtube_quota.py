@@ -0,0 +1,88 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from app.models import YouTubeQuota
+
+
+# =========================
+# 1. QUOTA DAY
+# =========================
+
+# YouTube quotas reset at midnight Pacific time
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+# Leave a little time after the reset before trying again
+RESET_GRACE = timedelta(minutes=5)
+
+
+def quota_day(now=None):
+    return (now or timezone.now()).astimezone(QUOTA_TZ).date()
+
+
+def next_reset(now=None):
+    """
+    The next midnight Pacific (as an aware datetime), plus RESET_GRACE.
+    """
+    tomorrow = quota_day(now) + timedelta(days=1)
+
+    return datetime.combine(tomorrow, time.min, tzinfo=QUOTA_TZ) + RESET_GRACE
+
+
+def _today(now=None):
+    quota, _ = YouTubeQuota.objects.get_or_create(day=quota_day(now))
+    return quota
+
+
+# =========================
+# 2. ACCOUNTING
+# =========================
+
+def uploads_left(now=None):
+    """
+    How many more uploads today's quota allows.
+    """
+    quota = _today(now)
+
+    if quota.exhausted_at:
+        return 0
+
+    left = settings.YOUTUBE_DAILY_QUOTA - quota.units_used
+
+    return max(0, left // settings.YOUTUBE_UPLOAD_COST)
+
+
+def reserve_upload(now=None):
+    """
+    Books the units for one upload before it starts. The conditional
+    UPDATE keeps two workers from overspending the same units.
+    Returns False when today's quota can't cover another upload.
+    """
+    quota = _today(now)
+    cost = settings.YOUTUBE_UPLOAD_COST
+
+    return bool(
+        YouTubeQuota.objects.filter(
+            pk=quota.pk,
+            exhausted_at__isnull=True,
+            units_used__lte=settings.YOUTUBE_DAILY_QUOTA - cost,
+        ).update(
+            units_used=F("units_used") + cost,
+            uploads=F("uploads") + 1,
+        )
+    )
+
+
+def mark_exhausted(now=None):
+    """
+    YouTube rejected an upload for quota: nothing more goes out today,
+    whatever our own count says.
+    """
+    quota = _today(now)
+
+    YouTubeQuota.objects.filter(pk=quota.pk).update(
+        exhausted_at=now or timezone.now()
+    )
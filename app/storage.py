@@ -0,0 +1,86 @@
+import hashlib
+import os
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+# Everything this storage writes lives under MEDIA_ROOT/<CAS_PREFIX>/
+CAS_PREFIX = "cas"
+
+
+def sha256_of(content, chunk_size=64 * 1024):
+    """
+    Hex SHA-256 of a Django File, read in chunks.
+    """
+    digest = hashlib.sha256()
+
+    if hasattr(content, "seek"):
+        content.seek(0)
+
+    for chunk in content.chunks(chunk_size):
+        digest.update(chunk)
+
+    if hasattr(content, "seek"):
+        content.seek(0)
+
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each upload under the SHA-256 of its bytes:
+
+        cas/3f/a9/3fa9...e1.webp
+
+    Identical uploads share one file, names never change once written
+    (so they can be cached forever), and the two-level shard keeps any
+    directory small. Files saved before this backend keep their old
+    names and are still served as before.
+
+    Because one file can back several rows, delete() leaves the file in
+    place; `manage.py prune_media` removes files nothing references.
+    """
+
+    def content_name(self, name, content):
+        digest = sha256_of(content)
+        ext = os.path.splitext(name)[1].lower()
+
+        return f"{CAS_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        path = self.content_name(name, content)
+
+        if self.exists(path):
+            return path
+
+        return super().save(path, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # A hash name is already unique; an existing file with the
+        # same name has the same bytes.
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+
+        # Write under a unique temporary name, then move into place
+        # atomically; if another request stored the same bytes meanwhile,
+        # replacing them changes nothing.
+        tmp_name = super()._save(f"{name}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(tmp_name), self.path(name))
+
+        return name
+
+    def delete(self, name):
+        if name and name.startswith(f"{CAS_PREFIX}/"):
+            return
+        super().delete(name)
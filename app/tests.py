@@ -19,12 +19,1215 @@ class CartContextProcessorTests(TestCase):
         session_middleware.process_request(request)
         request.session.save()
 
+        existing = Cart.objects.create(customer_session=request.session.session_key)
+        request.session["cart_count"] = 2
+
         context = cart(request)
 
         self.assertIn("cart", context)
         self.assertIn("cart_count", context)
-        self.assertEqual(context["cart_count"], 0)
+        self.assertEqual(context["cart_count"](), 2)
+        self.assertEqual(context["cart"](), existing)
+
+    def test_cart_context_processor_is_lazy_and_creates_nothing(self):
+        request = self.factory.get("/")
+        request.user = self.user
+
+        session_middleware = SessionMiddleware(lambda request: None)
+        session_middleware.process_request(request)
+
+        with self.assertNumQueries(0):
+            context = cart(request)
+            self.assertEqual(context["cart_count"](), 0)
+            self.assertIsNone(context["cart"]())
+
+        self.assertIsNone(request.session.session_key)
+        self.assertEqual(Cart.objects.count(), 0)
+
+
+class StoreSlugCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from app.services.store_cache import clear_local_cache
+
+        cache.clear()
+        clear_local_cache()
+        self.user = User.objects.create_user(username="seller", password="testpass123")
+
+    def test_unknown_slug_is_cached_as_missing(self):
+        from app.services.store_cache import get_store_by_slug
+
+        self.assertIsNone(get_store_by_slug("nope"))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_store_by_slug("nope"))
+
+    def test_store_save_invalidates_cached_slug(self):
+        from app.models import Store
+        from app.services.store_cache import get_store_by_slug
+
+        self.assertIsNone(get_store_by_slug("acme"))
+
+        store = Store.objects.create(brand_name="Acme", owner=self.user, bio="Bio")
+
+        self.assertEqual(get_store_by_slug("acme").id, store.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_store_by_slug("acme").id, store.id)
+
+        store.delete()
+
+        self.assertIsNone(get_store_by_slug("acme"))
+
+
+class CustomDomainIndexTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from app.services import domain_index
+
+        cache.clear()
+        domain_index._state["loaded"] = False
+        self.user = User.objects.create_user(username="premium", password="testpass123")
+
+    def test_verified_domain_resolves_without_query(self):
+        from app.models import CustomDomain, Store
+        from app.services.domain_index import get_store_id_for_host, load_index
+
+        store = Store.objects.create(brand_name="Ada Shop", owner=self.user, bio="Bio")
+        domain = CustomDomain.objects.create(store=store, domain="ShopWithAda.com", is_verified=True)
+        load_index()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_store_id_for_host("www.shopwithada.com"), store.id)
+
+        domain.is_verified = False
+        domain.save()
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_store_id_for_host("shopwithada.com"))
+
+    def test_change_from_another_worker_is_loaded_after_a_local_change(self):
+        from django.core.cache import cache
+
+        from app.models import CustomDomain, Store
+        from app.services import domain_index
+
+        store = Store.objects.create(brand_name="Ada Shop", owner=self.user, bio="Bio")
+        other = Store.objects.create(brand_name="Bola Shop", owner=self.user, bio="Bio")
+        domain_index.load_index()
+
+        # Another worker saved a domain: row written, version bumped
+        CustomDomain.objects.bulk_create([CustomDomain(store=other, domain="bola.ng", is_verified=True)])
+        cache.set(domain_index.VERSION_KEY, 1.0, None)
+
+        CustomDomain.objects.create(store=store, domain="ada.ng", is_verified=True)
+        domain_index._state["checked_at"] = 0
+
+        self.assertEqual(domain_index.get_store_id_for_host("bola.ng"), other.id)
+        self.assertEqual(domain_index.get_store_id_for_host("ada.ng"), store.id)
+
+
+    def test_warm_up_logs_a_failed_load_and_loads_the_rest(self):
+        from unittest import mock
+
+        from app.warmup import warm_up
+
+        with mock.patch("app.services.domain_index.load_index", side_effect=RuntimeError("db down")), \
+                mock.patch("app.services.search_index.load_indexes") as load_indexes, \
+                mock.patch("app.services.suggest.build") as build, \
+                self.assertLogs("app.warmup", level="ERROR"):
+            warm_up()
+
+        load_indexes.assert_called_once()
+        build.assert_called_once()
+
+
+class StoreSuspensionTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="testpass123")
+
+    def test_second_store_suspended_until_premium(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from app.models import Store, Subscription
+        from app.utils import store_is_suspended
+
+        first = Store.objects.create(brand_name="First", owner=self.user, bio="Bio")
+        second = Store.objects.create(brand_name="Second", owner=self.user, bio="Bio")
+
+        self.assertFalse(store_is_suspended(first))
+        self.assertTrue(store_is_suspended(second))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(store_is_suspended(second))
+
+        Subscription.objects.create(
+            user=self.user,
+            plan="premium_monthly",
+            expires_at=timezone.now() + timedelta(days=30),
+        )
+
+        self.assertFalse(store_is_suspended(second))
+
+    def test_entitlement_is_kept_briefly_without_a_shared_cache(self):
+        from unittest import mock
+
+        from django.test import override_settings
+
+        from app.models import Store
+        from app.services import entitlements
+
+        Store.objects.create(brand_name="First", owner=self.user, bio="Bio")
+
+        for shared, ttl in (
+            (True, entitlements.ENTITLEMENT_TTL),
+            (False, entitlements.LOCAL_ENTITLEMENT_TTL),
+        ):
+            with override_settings(CACHE_IS_SHARED=shared), \
+                    mock.patch.object(entitlements, "cache") as cache:
+                cache.get.return_value = None
+                entitlements.get_entitlement(self.user.id)
+
+            self.assertEqual(cache.set.call_args.args[2], ttl)
+
+
+class StoreRegistryTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="multi", password="testpass123")
+
+    def _request(self, session=None):
+        request = self.factory.get("/")
+        request.user = self.user
+
+        if session is None:
+            SessionMiddleware(lambda request: None).process_request(request)
+        else:
+            request.session = session
+
+        return request
+
+    def test_stores_loaded_once_per_request(self):
+        from app.context_processors import user_store
+        from app.models import Store
+        from app.services.store_registry import get_store_registry
+
+        store = Store.objects.create(brand_name="Mine", owner=self.user, bio="Bio")
+        request = self._request()
+
+        with self.assertNumQueries(1):
+            context = user_store(request)
+            self.assertEqual(context["active_store"](), store)
+            self.assertEqual(get_store_registry(request).first_store, store)
+            self.assertEqual(context["user_stores"](), [store])
+
+    def test_user_without_stores_is_remembered_in_session(self):
+        from app.services.store_registry import get_store_registry
+
+        request = self._request()
+        self.assertEqual(get_store_registry(request).stores, [])
+
+        next_request = self._request(session=request.session)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_store_registry(next_request).active_store)
+
+
+class ImpressionPipelineTests(TestCase):
+    def setUp(self):
+        from app.models import Item, Store
+
+        self.user = User.objects.create_user(username="shop", password="testpass123")
+        self.store = Store.objects.create(brand_name="Shop", owner=self.user, bio="Bio")
+        self.items = [
+            Item.objects.create(store=self.store, name=f"Item {i}") for i in range(3)
+        ]
+
+    def test_impressions_fold_into_item_views_once_per_session(self):
+        from app.models import Item, ItemView, StoreImpression
+        from app.services.impressions import process_impressions
+
+        ids = [item.id for item in self.items]
+        StoreImpression.objects.create(store=self.store, session_key="a", item_ids=ids)
+        StoreImpression.objects.create(store=self.store, session_key="a", item_ids=ids)
+        StoreImpression.objects.create(store=self.store, session_key="b", item_ids=ids[:1])
+
+        self.assertEqual(process_impressions(), 3)
+
+        self.assertEqual(StoreImpression.objects.count(), 0)
+        self.assertEqual(ItemView.objects.count(), 4)
+        self.assertEqual(Item.objects.get(id=ids[0]).views, 2)
+        self.assertEqual(Item.objects.get(id=ids[2]).views, 1)
+
+
+    def test_first_visit_starts_a_session_and_records_the_impression(self):
+        from django.contrib.auth.models import AnonymousUser
+
+        from app.models import Store, StoreImpression
+        from app.views import view_store
+
+        store = Store.objects.create(brand_name="Fresh", owner=self.user, bio="Bio")
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        SessionMiddleware(lambda request: None).process_request(request)
+
+        response = view_store(request, slug=store.slug)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(request.session.session_key)
+        self.assertEqual(StoreImpression.objects.get().session_key, request.session.session_key)
+
+
+class StoreCounterTests(TestCase):
+    def test_increments_are_buffered_then_flushed_atomically(self):
+        import io
+        import tempfile
+        from unittest import mock
+
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.core.management import call_command
+        from django.test import override_settings
+
+        from app.models import Store
+        from app.services import counters
+
+        user = User.objects.create_user(username="viral", password="testpass123")
+        store = Store.objects.create(brand_name="Viral", owner=user, bio="Bio")
+
+        # The web worker and the cron process each have their own cache
+        # object, backed by the same directory
+        location = tempfile.mkdtemp()
+        worker_cache = FileBasedCache(location, {})
+        cron_cache = FileBasedCache(location, {})
+
+        with override_settings(CACHE_IS_SHARED=True):
+            with mock.patch.object(counters, "cache", worker_cache), \
+                    self.assertNumQueries(0):
+                for _ in range(5):
+                    counters.increment(store.id, "total_views")
+                counters.increment(store.id, "total_orders", 2)
+
+            with mock.patch.object(counters, "cache", worker_cache):
+                self.assertEqual(counters.get_total(store, "total_views"), 5)
+
+            with mock.patch.object(counters, "cache", cron_cache):
+                call_command("flush_counters", stdout=io.StringIO())
+
+            store.refresh_from_db()
+
+            self.assertEqual(store.total_views, 5)
+            self.assertEqual(store.total_orders, 2)
+
+            with mock.patch.object(counters, "cache", worker_cache):
+                self.assertEqual(counters.get_total(store, "total_views"), 5)
+
+    def test_per_process_cache_writes_counts_straight_away(self):
+        import io
+        from unittest import mock
+
+        from django.core.cache.backends.locmem import LocMemCache
+        from django.core.management import call_command
+        from django.test import override_settings
+
+        from app.models import Store
+        from app.services import counters
+
+        user = User.objects.create_user(username="local", password="testpass123")
+        store = Store.objects.create(brand_name="Local", owner=user, bio="Bio")
+
+        with override_settings(CACHE_IS_SHARED=False):
+            with mock.patch.object(counters, "cache", LocMemCache("worker", {})):
+                for _ in range(3):
+                    counters.increment(store.id, "total_views")
+
+            with mock.patch.object(counters, "cache", LocMemCache("cron", {})):
+                call_command("flush_counters", stdout=io.StringIO())
+
+        store.refresh_from_db()
+        self.assertEqual(store.total_views, 3)
+        self.assertEqual(counters.get_total(store, "total_views"), 3)
+
+    def test_increment_never_raises(self):
+        from unittest import mock
+
+        from django.test import override_settings
+
+        from app.services import counters
+
+        with override_settings(CACHE_IS_SHARED=True), \
+                mock.patch.object(counters.cache, "incr", side_effect=ConnectionError("down")), \
+                self.assertLogs("app.services.counters", level="WARNING"):
+            counters.increment(1, "total_views")
+
+
+class LikeCountTests(TestCase):
+    def test_toggle_keeps_like_count_and_liked_set_in_step(self):
+        from django.core.cache import cache
+
+        from app.models import Item, Store
+        from app.services.likes import get_liked_item_ids, toggle_like
+
+        cache.clear()
+        owner = User.objects.create_user(username="maker", password="testpass123")
+        fan = User.objects.create_user(username="fan", password="testpass123")
+        store = Store.objects.create(brand_name="Maker", owner=owner, bio="Bio")
+        item = Item.objects.create(store=store, name="Mug")
+
+        self.assertEqual(toggle_like(item, fan), (True, 1))
+        self.assertEqual(get_liked_item_ids(fan), {item.id})
+
+        with self.assertNumQueries(0):
+            get_liked_item_ids(fan)
+
+        self.assertEqual(toggle_like(item, fan), (False, 0))
+        self.assertEqual(get_liked_item_ids(fan), set())
+        self.assertEqual(Item.objects.get(id=item.id).like_count, 0)
+
+
+class ItemCoverTests(TestCase):
+    def test_cover_follows_media_and_grids_resolve_without_queries(self):
+        from app.models import Item, ProductMedia, Store
+        from app.services.covers import with_covers
+
+        owner = User.objects.create_user(username="seller", password="testpass123")
+        store = Store.objects.create(brand_name="Seller", owner=owner, bio="Bio")
+        linked = Item.objects.create(store=store, name="Lamp", image_url="https://i.example.com/lamp.jpg")
+        bare = Item.objects.create(store=store, name="Rug")
+
+        self.assertEqual(linked.cover_url, "https://i.example.com/lamp.jpg")
+        self.assertEqual(bare.cover_url, "")
+
+        media = ProductMedia.objects.create(product=bare, youtube_url="https://youtu.be/abcdefghijk")
+        self.assertEqual(
+            Item.objects.get(id=bare.id).cover_url,
+            "https://img.youtube.com/vi/abcdefghijk/hqdefault.jpg",
+        )
+
+        media.delete()
+        self.assertEqual(Item.objects.get(id=bare.id).cover_url, "")
+
+        items = list(Item.objects.filter(store=store))
+        with self.assertNumQueries(0):
+            with_covers(items)
+
+
+class MarketplaceFeedTests(TestCase):
+    def test_fair_mix_is_capped_per_store_and_stable_per_seed(self):
+        from django.core.cache import cache
+
+        from app.models import Item, Store
+        from app.services.feed import PER_STORE, fair_mix_ids, fetch_items, marketplace_items
+
+        cache.clear()
+        owner = User.objects.create_user(username="bulk", password="testpass123")
+        big = Store.objects.create(brand_name="Big", owner=owner, bio="Bio")
+        small = Store.objects.create(brand_name="Small", owner=owner, bio="Bio")
+        for n in range(10):
+            Item.objects.create(store=big, name=f"Big {n}")
+        Item.objects.create(store=small, name="Small 0")
+
+        ids = fair_mix_ids(marketplace_items(), seed=7)
+
+        self.assertEqual(len(ids), PER_STORE + 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(fair_mix_ids(marketplace_items(), seed=7), ids)
+
+        with self.assertNumQueries(1):
+            self.assertEqual([item.id for item in fetch_items(ids[:3])], ids[:3])
+
+
+    def test_seed_travels_in_the_query_string_not_the_session(self):
+        from django.conf import settings
+        from django.core.cache import cache
+        from django.urls import reverse
+
+        from app.models import Item, Store
+
+        cache.clear()
+        for s in range(5):
+            owner = User.objects.create_user(username=f"pages{s}", password="testpass123")
+            store = Store.objects.create(brand_name=f"Pages {s}", owner=owner, bio="Bio")
+            for n in range(4):
+                Item.objects.create(store=store, name=f"Item {s}-{n}")
+
+        response = self.client.get(reverse("marketplace"))
+
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        seed = response.context["seed"]
+        self.assertContains(response, f"?page=2&seed={seed}")
+
+        again = self.client.get(reverse("marketplace"), {"page": 1, "seed": seed})
+        self.assertEqual(
+            [item.id for item in again.context["results"]],
+            [item.id for item in response.context["results"]],
+        )
+
+
+class ItemCategoryTests(TestCase):
+    def test_items_are_tagged_on_save_and_retagged_on_edit(self):
+        from app.models import Item, ItemCategory, Store
+        from app.services.feed import marketplace_items
+
+        owner = User.objects.create_user(username="tagger", password="testpass123")
+        store = Store.objects.create(brand_name="Tagger", owner=owner, bio="Bio")
+        item = Item.objects.create(store=store, name="Gaming Laptop", description="Comes with a mouse")
+
+        self.assertEqual(
+            set(ItemCategory.objects.filter(item=item).values_list("category", flat=True)),
+            {"gaming", "tech"},
+        )
+
+        item.name = "Leather belt"
+        item.description = ""
+        item.save()
+
+        self.assertEqual(
+            list(marketplace_items().filter(categories__category="accessories")),
+            [item],
+        )
+        self.assertFalse(marketplace_items().filter(categories__category="tech").exists())
+
+
+class FuzzySearchIndexTests(TestCase):
+    def test_index_follows_saves_and_returns_exact_rows(self):
+        from app.models import Item, Store
+        from app.services.search_index import product_index
+
+        owner = User.objects.create_user(username="finder", password="testpass123")
+        store = Store.objects.create(brand_name="Finder", owner=owner, bio="Bio")
+        first = Item.objects.create(store=store, name="Red Sneakers")
+        product_index.load()
+        second = Item.objects.create(store=store, name="Red Sneakers")
+        Item.objects.create(store=store, name="Blue Kettle")
+
+        with self.assertNumQueries(0):
+            ids = product_index.search("red sneakers")
+
+        self.assertEqual(sorted(ids), [first.id, second.id])
+
+        first.delete()
+        self.assertEqual(product_index.search("red sneakers"), [second.id])
+
+    def test_change_from_another_worker_is_loaded_after_a_local_change(self):
+        from django.core.cache import cache
+
+        from app.models import Item, Store
+        from app.services.search_index import product_index
+
+        owner = User.objects.create_user(username="seeker", password="testpass123")
+        store = Store.objects.create(brand_name="Seeker", owner=owner, bio="Bio")
+        product_index.load()
+
+        # Another worker saved an item: row written, version bumped
+        elsewhere = Item.objects.bulk_create([Item(store=store, name="Copper Kettle", slug="copper-kettle")])[0]
+        cache.add(product_index.version_key, 0, None)
+        cache.incr(product_index.version_key)
+
+        Item.objects.create(store=store, name="Copper Pan")
+        product_index._state["checked_at"] = 0
+
+        self.assertIn(elsewhere.id, product_index.search("copper kettle"))
+
+    def test_own_change_does_not_reload_the_index(self):
+        from app.models import Item, Store
+        from app.services.search_index import product_index
+
+        owner = User.objects.create_user(username="keeper", password="testpass123")
+        store = Store.objects.create(brand_name="Keeper", owner=owner, bio="Bio")
+        product_index.load()
+
+        item = Item.objects.create(store=store, name="Brass Lamp")
+        product_index._state["checked_at"] = 0
+
+        with self.assertNumQueries(0):
+            self.assertEqual(product_index.search("brass lamp"), [item.id])
+
+
+class FullTextSearchTests(TestCase):
+    def test_sqlite_backend_ranks_and_scopes_item_matches(self):
+        from app.models import Item, Store
+        from app.services.search import search_items, search_stores
+
+        owner = User.objects.create_user(username="ranker", password="testpass123")
+        shoes = Store.objects.create(brand_name="Shoe Palace", owner=owner, bio="Sneakers and boots")
+        other = Store.objects.create(brand_name="Other", owner=owner, bio="Bio")
+        runner = Item.objects.create(store=shoes, name="Running sneakers", description="Light sneakers for running")
+        boot = Item.objects.create(store=shoes, name="Boot", description="Goes well with sneakers")
+        elsewhere = Item.objects.create(store=other, name="Sneakers")
+
+        self.assertEqual(search_items("sneaker", store_id=shoes.id), [runner.id, boot.id])
+        self.assertIn(elsewhere.id, search_items("sneakers"))
+        self.assertEqual(search_stores("boots"), [shoes.id])
+
+        boot.delete()
+        self.assertEqual(search_items("sneaker", store_id=shoes.id), [runner.id])
+
+
+class SearchSuggestTests(TestCase):
+    def test_suggestions_are_ranked_and_scoped_per_store(self):
+        from app.models import Item, Store
+        from app.services import suggest
+
+        owner = User.objects.create_user(username="typer", password="testpass123")
+        one = Store.objects.create(brand_name="Runners Hub", owner=owner, bio="Bio")
+        two = Store.objects.create(brand_name="Other", owner=owner, bio="Bio")
+        Item.objects.create(store=one, name="Red Running Shoes", views=5)
+        Item.objects.create(store=one, name="Running Socks", views=50)
+        Item.objects.create(store=two, name="Rugby Ball")
+        suggest.build()
+
+        names = [s["name"] for s in suggest.suggest("run")]
+        self.assertEqual(names[:2], ["Running Socks", "Red Running Shoes"])
+        self.assertIn("Runners Hub", names)
+
+        with self.assertNumQueries(0):
+            scoped = suggest.suggest("ru", store_id=two.id)
+        self.assertEqual([s["name"] for s in scoped], ["Rugby Ball"])
+
+        response = self.client.get("/search/suggest/", {"q": "sock", "store": one.slug})
+        self.assertEqual(response.json()["results"][0]["name"], "Running Socks")
+
+    def test_changes_rebuild_in_background_while_old_trie_serves(self):
+        from unittest import mock
+
+        from app.models import Item, Store
+        from app.services import suggest
+
+        owner = User.objects.create_user(username="stale", password="testpass123")
+        store = Store.objects.create(brand_name="Stale", owner=owner, bio="Bio")
+        Item.objects.create(store=store, name="Teapot")
+        suggest.build()
+
+        Item.objects.create(store=store, name="Teacup")  # bumps the version
+        suggest._state["checked_at"] = 0
+
+        with mock.patch.object(suggest.threading, "Thread") as thread:
+            with self.assertNumQueries(0):
+                names = [s["name"] for s in suggest.suggest("tea", store_id=store.id)]
+            suggest._state["checked_at"] = 0
+            suggest.suggest("tea", store_id=store.id)
+
+        self.assertEqual(names, ["Teapot"])  # old trie, no inline rebuild
+        thread.assert_called_once_with(target=suggest._rebuild, daemon=True)
+
+        with mock.patch.object(suggest, "connection"):  # the thread closes its own connection
+            suggest._rebuild()
+        self.assertFalse(suggest._state["rebuilding"])
         self.assertEqual(
-            Cart.objects.filter(customer_session=request.session.session_key).count(),
-            1,
+            sorted(s["name"] for s in suggest.suggest("tea", store_id=store.id)),
+            ["Teacup", "Teapot"],
+        )
+
+
+class MediaUploadQueueTests(TestCase):
+    def test_upload_is_retried_then_moves_image_to_imgbb(self):
+        import tempfile
+        from unittest import mock
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+
+        from app.models import Item, MediaUpload, Store, StoreImage
+        from app.services import uploads
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            owner = User.objects.create_user(username="uploader", password="testpass123")
+            store = Store.objects.create(brand_name="Uploader", owner=owner, bio="Bio")
+            item = Item.objects.create(store=store, name="Vase")
+            extra = StoreImage.objects.create(
+                store=store, item=item, name="Vase",
+                image=SimpleUploadedFile("vase.jpg", b"jpeg-bytes", content_type="image/jpeg"),
+            )
+            upload = uploads.queue_store_image(extra)
+            self.assertEqual(uploads.upload_status(store)["pending"], 1)
+
+            with mock.patch("app.utils._imgbb_upload", side_effect=ValueError("timeout")):
+                self.assertEqual(uploads.process_uploads(), (1, 0))
+
+            upload.refresh_from_db()
+            self.assertEqual((upload.status, upload.attempts, upload.last_error), ("pending", 1, "timeout"))
+            self.assertEqual(uploads.process_uploads(), (0, 0))  # backing off
+
+            MediaUpload.objects.filter(id=upload.id).update(next_attempt_at=upload.created_at)
+            with mock.patch("app.utils._imgbb_upload", return_value="https://i.ibb.co/vase.jpg"):
+                self.assertEqual(uploads.process_uploads(), (1, 1))
+
+            extra.refresh_from_db()
+            self.assertEqual(extra.image_url, "https://i.ibb.co/vase.jpg")
+            self.assertFalse(extra.image)
+            self.assertEqual(Item.objects.get(id=item.id).cover_url, "https://i.ibb.co/vase.jpg")
+            self.assertEqual(uploads.upload_status(store)["uploads"], [])
+
+
+    def test_seller_edits_during_upload_are_kept(self):
+        import tempfile
+        from decimal import Decimal
+        from unittest import mock
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+
+        from app.models import Item, Store
+        from app.services import uploads
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            owner = User.objects.create_user(username="editor", password="testpass123")
+            store = Store.objects.create(brand_name="Editor", owner=owner, bio="Bio")
+            item = Item.objects.create(
+                store=store, name="Lamp", price=Decimal("100"),
+                image=SimpleUploadedFile("lamp.jpg", b"jpeg-bytes", content_type="image/jpeg"),
+            )
+            uploads.queue_item_image(item)
+
+            def slow_upload(files):
+                # The seller edits the product while ImgBB is busy
+                Item.objects.filter(id=item.id).update(name="Brass lamp", price=Decimal("150"))
+                return [{"file": f, "url": "https://i.ibb.co/lamp.jpg", "error": None} for f in files]
+
+            with mock.patch.object(uploads, "upload_many_to_imgbb", side_effect=slow_upload):
+                self.assertEqual(uploads.process_uploads(), (1, 1))
+
+            item.refresh_from_db()
+            self.assertEqual((item.name, item.price), ("Brass lamp", Decimal("150")))
+            self.assertEqual(item.image_url, "https://i.ibb.co/lamp.jpg")
+            self.assertFalse(item.image)
+
+    def test_shared_queue_reclaims_stale_rows_and_gives_up(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from app.models import MediaUpload, Store
+        from app.services.work_queue import MAX_ATTEMPTS, STALE_AFTER, claim, schedule_retry
+
+        owner = User.objects.create_user(username="queue", password="testpass123")
+        store = Store.objects.create(brand_name="Queue", owner=owner, bio="Bio")
+        due = MediaUpload.objects.create(store=store, kind="item_image")
+        later = MediaUpload.objects.create(
+            store=store, kind="item_image", next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+        stale = MediaUpload.objects.create(store=store, kind="item_image", status="processing")
+        MediaUpload.objects.filter(id=stale.id).update(updated_at=timezone.now() - STALE_AFTER * 2)
+
+        claimed = claim(MediaUpload.objects.all(), 10)
+
+        self.assertEqual(sorted(u.id for u in claimed), [due.id, stale.id])
+        self.assertEqual(MediaUpload.objects.get(id=later.id).status, "pending")
+
+        due.attempts = 1
+        self.assertFalse(schedule_retry(due))
+        self.assertEqual(due.status, "pending")
+        self.assertGreater(due.next_attempt_at, timezone.now())
+
+        due.attempts = MAX_ATTEMPTS
+        self.assertTrue(schedule_retry(due))
+        self.assertEqual(due.status, "failed")
+
+
+class ImgbbBatchUploadTests(TestCase):
+    def test_batch_runs_concurrently_and_reports_each_file(self):
+        import io
+        import threading
+        from unittest import mock
+
+        from app import utils
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_upload(f):
+            barrier.wait()  # only passes if all three run at once
+            if f.read() == b"bad":
+                raise ValueError("Invalid image")
+            return "https://i.ibb.co/ok.jpg"
+
+        files = [io.BytesIO(b"a"), io.BytesIO(b"bad"), io.BytesIO(b"c")]
+        with mock.patch.object(utils, "_imgbb_upload", side_effect=fake_upload):
+            results = utils.upload_many_to_imgbb(files)
+
+        self.assertEqual(
+            [(r["file"], r["url"], r["error"]) for r in results],
+            [
+                (files[0], "https://i.ibb.co/ok.jpg", None),
+                (files[1], None, "Invalid image"),
+                (files[2], "https://i.ibb.co/ok.jpg", None),
+            ],
+        )
+
+
+class MultipartFileStreamTests(TestCase):
+    def test_stream_matches_a_regular_multipart_body(self):
+        import io
+        from email.parser import BytesParser
+
+        from app.utils import MultipartFileStream
+
+        payload = bytes(range(256)) * 1000  # several chunks
+        body = MultipartFileStream({"key": "abc"}, "image", io.BytesIO(payload), filename="a.png", content_type="image/png")
+        chunks = list(body)
+
+        self.assertTrue(all(len(c) <= max(MultipartFileStream.CHUNK_SIZE, len(body.head)) for c in chunks))
+        self.assertEqual(sum(len(c) for c in chunks), len(body))
+
+        message = BytesParser().parsebytes(
+            f"Content-Type: {body.content_type}\r\n\r\n".encode() + b"".join(chunks)
+        )
+        key, image = message.get_payload()
+        self.assertEqual(key.get_payload(), "abc")
+        self.assertEqual(image.get_filename(), "a.png")
+        self.assertEqual(image.get_payload(decode=True), payload)
+
+
+class ImageVariantTests(TestCase):
+    def test_variants_are_resized_upright_webp_without_exif(self):
+        import io
+
+        from PIL import Image
+
+        from app.services.images import VARIANTS, make_variants
+
+        photo = Image.new("RGB", (4000, 3000), "red")
+        exif = photo.getexif()
+        exif[0x0112] = 6  # orientation: rotate 90° clockwise
+        exif[0x010F] = "PhoneMaker"
+        upload = io.BytesIO()
+        photo.save(upload, "JPEG", exif=exif)
+        upload.name = "IMG_0001.jpg"
+
+        variants = make_variants(upload)
+
+        self.assertEqual(set(variants), set(VARIANTS))
+        for name, content in variants.items():
+            with Image.open(io.BytesIO(content.read())) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.size, (VARIANTS[name] * 3 // 4, VARIANTS[name]))  # now portrait
+                self.assertFalse(image.getexif())
+            self.assertEqual(content.name, f"IMG_0001-{name}.webp")
+
+    def test_unreadable_replacement_drops_old_variants(self):
+        import tempfile
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+
+        from app.models import Item, Store
+        from app.services.images import optimize_image
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root, MEDIA_URL="/media/"):
+            owner = User.objects.create_user(username="swapper", password="testpass123")
+            store = Store.objects.create(brand_name="Swapper", owner=owner, bio="Bio")
+            item = Item.objects.create(
+                store=store, name="Vase",
+                image_variants={"thumb": "/media/old-thumb.webp", "card": "/media/old-card.webp"},
+            )
+
+            upload = SimpleUploadedFile("vase.heic", b"not an image Pillow reads", content_type="image/heic")
+            self.assertFalse(optimize_image(item, upload, "item_images"))
+            item.image = upload
+            item.save()
+
+            item.refresh_from_db()
+            self.assertEqual(item.image_variants, {})
+            self.assertNotIn("old-card", item.cover_url)
+
+
+    def test_grids_get_a_srcset_and_the_product_page_the_full_image(self):
+        from app.models import Item, Store
+
+        owner = User.objects.create_user(username="sizes", password="testpass123")
+        store = Store.objects.create(brand_name="Sizes", owner=owner, bio="Bio")
+        item = Item.objects.create(
+            store=store, name="Lamp",
+            image_url="https://i.ibb.co/lamp-full.webp",
+            image_variants={"thumb": "/media/lamp-thumb.webp", "card": "/media/lamp-card.webp"},
+        )
+
+        self.assertEqual(item.cover_url, "/media/lamp-card.webp")
+        self.assertEqual(item.cover_srcset, "/media/lamp-thumb.webp 320w, /media/lamp-card.webp 800w")
+        self.assertEqual(item.full_image_url, "https://i.ibb.co/lamp-full.webp")
+
+        response = self.client.get(item.get_absolute_url())
+        self.assertContains(response, 'src="https://i.ibb.co/lamp-full.webp"')
+
+        item.image_variants = {}
+        self.assertEqual(item.cover_srcset, "")
+
+
+class ContentAddressedStorageTests(TestCase):
+    def test_identical_uploads_share_one_immutable_file(self):
+        import os
+        import tempfile
+
+        from django.core.files.base import ContentFile
+        from django.test import override_settings
+
+        from app.storage import ContentAddressedStorage
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root, MEDIA_URL="/media/"):
+            storage = ContentAddressedStorage()
+            first = storage.save("item_images/whatsapp.jpeg", ContentFile(b"same bytes"))
+            second = storage.save("store_images/whatsapp_dK9tjCl.JPEG", ContentFile(b"same bytes"))
+            other = storage.save("item_images/other.jpeg", ContentFile(b"other bytes"))
+
+            self.assertEqual(first, second)
+            self.assertNotEqual(first, other)
+            self.assertRegex(first, r"^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpeg$")
+
+            storage.delete(first)  # shared: kept until prune_media
+            self.assertTrue(storage.exists(first))
+
+            response = self.client.get(f"/media/{first}")
+            self.assertEqual(b"".join(response.streaming_content), b"same bytes")
+            self.assertIn("immutable", response["Cache-Control"])
+            self.assertEqual(
+                self.client.get(f"/media/{first}", HTTP_IF_NONE_MATCH=response["ETag"]).status_code,
+                304,
+            )
+
+            os.remove(storage.path(first))  # pruned
+            self.assertEqual(
+                self.client.get(f"/media/{first}", HTTP_IF_NONE_MATCH=response["ETag"]).status_code,
+                404,
+            )
+
+
+    def test_only_raster_images_and_video_are_served_inline(self):
+        import tempfile
+
+        from django.core.files.base import ContentFile
+        from django.test import override_settings
+
+        from app.storage import ContentAddressedStorage
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root, MEDIA_URL="/media/"):
+            storage = ContentAddressedStorage()
+            photo = storage.save("item_images/photo.jpg", ContentFile(b"jpeg bytes"))
+            svg = storage.save("item_images/logo.svg", ContentFile(b"<svg onload='alert(1)'/>"))
+
+            response = self.client.get(f"/media/{photo}")
+            self.assertEqual(response["Content-Type"], "image/jpeg")
+            self.assertTrue(response["Content-Disposition"].startswith("inline"))
+            self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+            response = self.client.get(f"/media/{svg}")
+            self.assertEqual(response["Content-Type"], "application/octet-stream")
+            self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+            self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+
+class YouTubeCredentialCacheTests(TestCase):
+    def test_token_is_refreshed_once_until_near_expiry(self):
+        import datetime
+        from unittest import mock
+
+        from app import utils
+
+        manager = utils.YouTubeCredentialManager()
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        refreshes = []
+
+        def fake_refresh(creds, request):
+            refreshes.append(1)
+            creds.token = f"token-{len(refreshes)}"
+            creds.expiry = now + (datetime.timedelta(hours=1) if len(refreshes) == 1 else datetime.timedelta(hours=2))
+
+        with mock.patch.multiple(utils, YOUTUBE_CLIENT_ID="id", YOUTUBE_CLIENT_SECRET="secret", YOUTUBE_REFRESH_TOKEN="refresh"), \
+                mock.patch.object(utils.Credentials, "refresh", autospec=True, side_effect=fake_refresh):
+            self.assertEqual(manager.access_token(), "token-1")
+            self.assertEqual(manager.access_token(), "token-1")
+            self.assertEqual(len(refreshes), 1)
+
+            manager._creds.expiry = now + datetime.timedelta(minutes=2)  # inside the margin
+            self.assertEqual(manager.access_token(), "token-2")
+
+
+class ResumableVideoUploadTests(TestCase):
+    def test_upload_resumes_at_offset_then_goes_to_youtube(self):
+        import os
+        import tempfile
+        from unittest import mock
+
+        from django.test import override_settings
+
+        from app.models import Item, ProductMedia, Store, VideoUpload
+        from app.services import video_uploads
+
+        video = os.urandom(3000)
+
+        with tempfile.TemporaryDirectory() as spool, override_settings(VIDEO_UPLOAD_DIR=spool):
+            owner = User.objects.create_user(username="filmer", password="testpass123")
+            store = Store.objects.create(brand_name="Filmer", owner=owner, bio="Bio")
+            self.client.force_login(owner)
+
+            response = self.client.post(
+                f"/store/{store.slug}/uploads/video/",
+                headers={"Upload-Length": "3000", "Upload-Metadata": "filetype dmlkZW8vbXA0"},
+            )
+            self.assertEqual(response.status_code, 201)
+            url = response["Location"]
+
+            def patch(offset, body):
+                return self.client.patch(
+                    url, body, content_type="application/offset+octet-stream",
+                    headers={"Upload-Offset": str(offset)},
+                )
+
+            self.assertEqual(patch(0, video[:1200])["Upload-Offset"], "1200")  # connection drops here
+            self.assertEqual(self.client.head(url)["Upload-Offset"], "1200")
+            self.assertEqual(patch(0, video[:1200]).status_code, 409)
+            self.assertEqual(patch(1200, video[1200:]).status_code, 204)
+
+            upload = VideoUpload.objects.get()
+            self.assertEqual(upload.status, "received")
+            with open(video_uploads.spool_path(upload), "rb") as f:
+                self.assertEqual(f.read(), video)
+
+            item = Item.objects.create(store=store, name="Reel")
+            self.assertEqual(video_uploads.attach_uploads(item, [str(upload.token)]), 1)
+
+            def fake_youtube(path, title, description, on_progress):
+                on_progress(50)
+                return {"id": "abcDEF12345"}
+
+            with mock.patch.object(video_uploads, "upload_to_youtube", side_effect=fake_youtube):
+                self.assertEqual(video_uploads.process_video_uploads(), (1, 1))
+
+            media = ProductMedia.objects.get(product=item)
+            self.assertEqual(media.youtube_url, "https://www.youtube.com/watch?v=abcDEF12345")
+            self.assertEqual(self.client.get(url).json()["status"], "done")
+            self.assertFalse(os.path.exists(video_uploads.spool_path(upload)))
+
+
+class YouTubeQuotaSchedulingTests(TestCase):
+    def test_uploads_stop_at_quota_and_wait_for_pacific_midnight(self):
+        import datetime
+        import os
+        import tempfile
+        from unittest import mock
+
+        from django.test import override_settings
+        from django.utils import timezone
+
+        from app.models import Item, ProductMedia, Store, VideoUpload
+        from app.services import video_uploads, youtube_quota
+        from app.utils import YouTubeQuotaExceeded
+
+        # 23:30 PST on Jan 14 -> the quota resets 08:00 UTC on Jan 15
+        late = datetime.datetime(2026, 1, 15, 7, 30, tzinfo=datetime.timezone.utc)
+        self.assertEqual(
+            youtube_quota.next_reset(late),
+            datetime.datetime(2026, 1, 15, 8, 0, tzinfo=datetime.timezone.utc) + youtube_quota.RESET_GRACE,
+        )
+
+        with tempfile.TemporaryDirectory() as spool, \
+                override_settings(VIDEO_UPLOAD_DIR=spool, YOUTUBE_DAILY_QUOTA=3200, YOUTUBE_UPLOAD_COST=1600):
+            owner = User.objects.create_user(username="quota", password="testpass123")
+            store = Store.objects.create(brand_name="Quota", owner=owner, bio="Bio")
+            item = Item.objects.create(store=store, name="Clip")
+
+            for _ in range(3):
+                upload = video_uploads.create_upload(store, 4, content_type="video/mp4")
+                with open(video_uploads.spool_path(upload), "wb") as f:
+                    f.write(b"clip")
+                VideoUpload.objects.filter(pk=upload.pk).update(item=item, status="pending", offset=4)
+
+            with mock.patch.object(video_uploads, "upload_to_youtube", side_effect=[
+                {"id": "first123456"},
+                YouTubeQuotaExceeded("limit"),
+            ]):
+                self.assertEqual(video_uploads.process_video_uploads(), (2, 1))
+                self.assertEqual(youtube_quota.uploads_left(), 0)
+                self.assertEqual(video_uploads.process_video_uploads(), (0, 0))
+
+            self.assertEqual(ProductMedia.objects.get(product=item).youtube_id, "first123456")
+
+            deferred = VideoUpload.objects.exclude(status="done").order_by("id")
+            self.assertEqual([u.status for u in deferred], ["pending", "pending"])
+            self.assertEqual(deferred[0].attempts, 0)
+            self.assertEqual(deferred[0].next_attempt_at, youtube_quota.next_reset())
+            self.assertGreater(deferred[0].next_attempt_at, timezone.now())
+            self.assertTrue(os.path.exists(video_uploads.spool_path(deferred[0])))
+
+
+class PaystackClientTests(TestCase):
+    def test_gets_are_retried_but_posts_are_not(self):
+        from unittest import mock
+
+        import requests
+
+        from app.services import paystack as paystack_module
+
+        def reply(status, body):
+            response = mock.Mock(status_code=status)
+            response.json.return_value = body
+            return response
+
+        client = paystack_module.PaystackClient(secret_key="sk_test")
+
+        with mock.patch.object(client.session, "request", side_effect=[
+            requests.ConnectionError("reset"),
+            reply(502, {"status": False}),
+            reply(200, {"status": True, "data": {"status": "success"}}),
+        ]) as send, mock.patch.object(paystack_module.time, "sleep"):
+            res = client.verify_transaction("WPF-1")
+
+        self.assertEqual(res["data"]["status"], "success")
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(send.call_args.args[1], "https://api.paystack.co/transaction/verify/WPF-1")
+        self.assertEqual(send.call_args.kwargs["timeout"], paystack_module.TIMEOUTS["transaction/verify"])
+        self.assertEqual(send.call_args.kwargs["headers"]["Authorization"], "Bearer sk_test")
+        self.assertEqual(client.metrics["transaction/verify"]["calls"], 3)
+        self.assertEqual(client.metrics["transaction/verify"]["errors"], 2)
+
+        with mock.patch.object(client.session, "request", side_effect=requests.Timeout("slow")) as send, \
+                self.assertLogs("app.services.paystack", level="WARNING"):
+            res = client.initialize_transaction(email="a@b.c", amount=100)
+
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(res, {"status": False, "message": paystack_module.UNAVAILABLE})
+
+
+class PaystackBankCacheTests(TestCase):
+    def test_bank_list_and_resolve_results_are_served_locally(self):
+        from unittest import mock
+
+        from django.core.cache import cache
+
+        from app.models import PaystackBank
+        from app.services import banks
+
+        cache.clear()
+        listing = {"status": True, "data": [
+            {"id": 1, "name": "Access Bank", "code": "044", "active": True},
+            {"id": 2, "name": "GTBank", "code": "058", "active": True},
+        ]}
+        resolved = {"status": True, "data": {"account_name": "ADA OBI"}}
+
+        with mock.patch.object(banks.paystack, "list_banks", return_value=listing) as list_banks, \
+                mock.patch.object(banks.paystack, "resolve_account", return_value=resolved) as resolve:
+            self.assertEqual([b.name for b in banks.get_banks()], ["Access Bank", "GTBank"])
+            self.assertEqual([b.code for b in banks.get_banks()], ["044", "058"])
+            self.assertEqual(list_banks.call_count, 1)  # second page load is local
+            self.assertEqual(banks.bank_name("058"), "GTBank")
+
+            self.assertEqual(banks.resolve_account("0123456789", "058"), resolved)
+            self.assertEqual(banks.resolve_account("0123456789", "058"), resolved)
+            self.assertEqual(resolve.call_count, 1)
+
+            listing["data"] = listing["data"][1:]
+            self.assertEqual(banks.refresh_banks(), 1)
+
+        self.assertFalse(PaystackBank.objects.get(code="044").active)
+        self.assertEqual(banks.bank_name("044"), "")
+
+
+class PaystackWebhookTests(TestCase):
+    def test_events_are_stored_once_and_settled_once(self):
+        import hashlib
+        import hmac
+        import json
+        from decimal import Decimal
+
+        from django.test import override_settings
+
+        from app.models import Order, Payment, PaystackEvent, Store, Subscription, Wallet
+        from app.services.paystack_events import process_events
+
+        seller = User.objects.create_user(username="seller", password="testpass123")
+        buyer = User.objects.create_user(username="subscriber", password="testpass123")
+        store = Store.objects.create(brand_name="Hooked", owner=seller, bio="Bio")
+        order = Order.objects.create(
+            store=store, seller=seller, customer_name="Ada", customer_email="ada@example.com",
+            customer_phone="0800", delivery_address="Lagos", amount=Decimal("5000"),
+            seller_amount=Decimal("4500"), paystack_reference="WPF-REF-1",
+        )
+        Payment.objects.create(user=buyer, amount=Decimal("3000"), plan="premium_yearly", reference="SUB-REF-1")
+
+        def deliver(body, secret="sk_test_hook"):
+            payload = json.dumps(body).encode()
+            signature = hmac.new(secret.encode(), payload, hashlib.sha512).hexdigest()
+            return self.client.post(
+                "/paystack/webhook/", payload, content_type="application/json",
+                headers={"x-paystack-signature": signature},
+            )
+
+        order_paid = {"event": "charge.success", "data": {
+            "reference": "WPF-REF-1", "status": "success", "amount": 500000,
+            "metadata": {"type": "store_order", "order_id": order.id},
+        }}
+        plan_paid = {"event": "charge.success", "data": {
+            "reference": "SUB-REF-1", "status": "success", "amount": 300000,
+            "metadata": {"user_id": buyer.id, "plan": "premium_yearly"},
+        }}
+
+        with override_settings(PAYSTACK_SECRET_KEY="sk_test_hook"):
+            self.assertEqual(deliver(order_paid, secret="wrong").status_code, 400)
+            self.assertEqual(deliver(order_paid).json(), {"status": "received"})
+            self.assertEqual(deliver(order_paid).json(), {"status": "duplicate"})
+            self.assertEqual(deliver(plan_paid).json(), {"status": "received"})
+            self.assertEqual(deliver({"event": "transfer.success", "data": {"reference": "T1"}}).status_code, 200)
+
+        self.assertEqual(Order.objects.get(id=order.id).status, "PENDING_PAYMENT")  # not applied inline
+        self.assertEqual(process_events(), (2, 2))
+        self.assertEqual(process_events(), (0, 0))
+
+        self.assertEqual(Order.objects.get(id=order.id).status, "ON_HOLD")  # default SellerTrust
+        self.assertEqual(Wallet.objects.get(user=seller).lifetime_earnings, Decimal("4500"))
+        self.assertEqual(Subscription.objects.get(user=buyer).plan, "premium_yearly")
+        self.assertEqual(Payment.objects.get(reference="SUB-REF-1").status, "success")
+        self.assertEqual(
+            sorted(PaystackEvent.objects.values_list("status", flat=True)),
+            ["ignored", "processed", "processed"],
+        )
+
+        # The browser callback arriving late changes nothing
+        from app.services.settlement import settle_order, settle_subscription
+        self.assertFalse(settle_order("WPF-REF-1", order_paid["data"], order_id=order.id)[1])
+        self.assertFalse(settle_subscription(buyer.id, "premium_yearly", "SUB-REF-1")[1])
+        self.assertEqual(Wallet.objects.get(user=seller).lifetime_earnings, Decimal("4500"))
+
+    def test_browser_callback_after_webhook_still_clears_the_cart(self):
+        from decimal import Decimal
+        from unittest import mock
+
+        from django.urls import reverse
+
+        from app.models import Cart, CartItem, Item, Order, Store
+        from app.services.paystack_events import process_events, store_event
+
+        seller = User.objects.create_user(username="late", password="testpass123")
+        store = Store.objects.create(brand_name="Late", owner=seller, bio="Bio")
+        item = Item.objects.create(store=store, name="Mug", price=Decimal("2500"))
+        order = Order.objects.create(
+            store=store, seller=seller, customer_name="Ada", customer_email="ada@example.com",
+            customer_phone="0800", delivery_address="Lagos", amount=Decimal("2500"),
+            seller_amount=Decimal("2250"), paystack_reference="WPF-REF-2",
+        )
+
+        session = self.client.session
+        session["cart_count"] = 1
+        session.save()
+        cart = Cart.objects.create(customer_session=session.session_key)
+        CartItem.objects.create(cart=cart, product=item, quantity=1)
+
+        store_event(
+            b'{"event": "charge.success", "data": {"reference": "WPF-REF-2", "status": "success", '
+            b'"amount": 250000, "metadata": {"type": "store_order", "order_id": %d}}}' % order.id
+        )
+        self.assertEqual(process_events(), (1, 1))
+
+        from app.services import paystack as paystack_module
+        with mock.patch.object(paystack_module.paystack, "verify_transaction") as verify:
+            response = self.client.get("/payment/success/", {"reference": "WPF-REF-2"})
+
+        verify.assert_not_called()
+        self.assertRedirects(
+            response, reverse("verify_order", kwargs={"token": order.verification_token}),
+            fetch_redirect_response=False
         )
+        self.assertFalse(CartItem.objects.filter(cart=cart).exists())
+        self.assertEqual(self.client.session["cart_count"], 0)
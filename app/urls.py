@@ -53,6 +53,7 @@ urlpatterns = [
     # -------------------------
     path('register/', views.register, name='register'),
     path("search/products/", views.product_search, name="product_search"),
+    path("search/suggest/", views.search_suggest, name="search_suggest"),
     path("youtube-token/", views.youtube_token, name="youtube-token"),
     # -------------------------
     # Store
@@ -66,6 +67,10 @@ urlpatterns = [
     path('store/delete-item/<slug:slug>/<int:item_id>/', views.delete_item, name='delete_item'),
     path('store/delete-extra-image/<slug:slug>/<int:image_id>/', views.delete_extra_image, name='delete_extra_image'),
     path("store/<slug:slug>/delete-video/<int:video_id>/", views.delete_extra_video, name="delete_extra_video"),
+    path("store/<slug:slug>/uploads/status/", views.media_upload_status, name="media_upload_status"),
+    path("store/<slug:slug>/uploads/video/", views.video_upload_create, name="video_upload_create"),
+    path("store/<slug:slug>/uploads/video/<uuid:token>/", views.video_upload_detail, name="video_upload_detail"),
+    path("media/cas/<path:path>", views.serve_media, name="serve_media"),
     path('product/<slug:slug>/', views.product_detail, name='product_detail'),
     path('like-item/<int:item_id>/', views.like_item, name='like_item'),
     path('add-product/', views.add_product, name='add_product'),
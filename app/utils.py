@@ -1,6 +1,9 @@
 import os
-import base64
+import datetime
+import threading
+import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
@@ -8,7 +11,7 @@ from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-import requests, base64
+import requests
 from googleapiclient.errors import HttpError
 
 # ---- Config ----
@@ -24,83 +27,241 @@ CLIENT_SECRETS_FILE = os.path.join(YOUTUBE_CREDENTIALS_DIR, "client_secret.json"
 TOKEN_FILE = os.path.join(YOUTUBE_CREDENTIALS_DIR, "token.json")
 
 # ---- ImgBB Upload ----
+IMGBB_UPLOAD_URL = "https://api.imgbb.com/1/upload"
+IMGBB_TIMEOUT = 15
 
-def upload_to_imgbb(image_file):
+# Concurrent uploads per batch (and pooled connections to ImgBB)
+IMGBB_MAX_WORKERS = getattr(settings, "IMGBB_MAX_WORKERS", 4)
+
+_imgbb = {"session": None}
+_imgbb_lock = threading.Lock()
+
+
+def _imgbb_session():
+    """
+    One keep-alive Session per process, shared by every upload thread.
+    """
+    if _imgbb["session"] is None:
+        with _imgbb_lock:
+            if _imgbb["session"] is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=IMGBB_MAX_WORKERS,
+                )
+                session.mount("https://", adapter)
+                _imgbb["session"] = session
+
+    return _imgbb["session"]
+
+
+class MultipartFileStream:
+    """
+    A multipart/form-data body that reads the file in chunks as it is
+    sent, instead of building the whole request in memory. __len__ lets
+    requests send a Content-Length rather than chunked encoding.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, fields, file_field, file_obj, filename="upload", content_type="application/octet-stream"):
+        self.boundary = uuid.uuid4().hex
+        self.file_obj = file_obj
+
+        head = b""
+        for name, value in fields.items():
+            head += (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode()
+
+        head += (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+
+        self.head = head
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+        file_obj.seek(0, os.SEEK_END)
+        self.file_size = file_obj.tell()
+        file_obj.seek(0)
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+
+        self.file_obj.seek(0)
+        while True:
+            chunk = self.file_obj.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+        yield self.tail
+
+
+def _imgbb_upload(image_file):
+    """
+    Uploads one file and returns its URL; raises on any failure.
+    Memory use is one chunk, whatever the file size.
+    """
     if not IMGBB_API_KEY:
-        print("ImgBB API key is missing in settings.")
-        return None
+        raise ValueError("ImgBB API key is missing in settings.")
+
+    body = MultipartFileStream(
+        {"key": IMGBB_API_KEY},
+        "image",
+        image_file,
+        filename=os.path.basename(getattr(image_file, "name", "") or "upload").replace('"', ""),
+        content_type=getattr(image_file, "content_type", None) or "application/octet-stream",
+    )
+
+    response = _imgbb_session().post(
+        IMGBB_UPLOAD_URL,
+        data=body,
+        headers={"Content-Type": body.content_type},
+        timeout=IMGBB_TIMEOUT,
+    )
+    result = response.json()
+
+    if response.status_code == 200 and result.get("success"):
+        return result["data"]["url"]
+
+    raise ValueError(result.get("error", {}).get("message", "Unknown error"))
 
+
+def upload_to_imgbb(image_file):
     try:
-        image_file.seek(0)  
-        url = "https://api.imgbb.com/1/upload"
-        payload = {
-            "key": IMGBB_API_KEY,
-            "image": base64.b64encode(image_file.read()).decode("utf-8"),
-        }
-
-        response = requests.post(url, data=payload, timeout=15)
-        result = response.json()
-
-        if response.status_code == 200 and result.get("success"):
-            return result["data"]["url"]
-        else:
-            print("ImgBB upload failed:", result.get("error", {}).get("message", "Unknown error"))
+        return _imgbb_upload(image_file)
 
     except requests.exceptions.RequestException as e:
         print("ImgBB request failed:", e)
     except Exception as e:
-        print("Unexpected error during ImgBB upload:", e)
+        print("ImgBB upload failed:", e)
 
     return None
 
 
-# ---- YouTube Auth ----
-def get_youtube_service():
+def upload_many_to_imgbb(files, max_workers=IMGBB_MAX_WORKERS):
     """
-    Creates a YouTube API service using credentials from environment variables.
+    Uploads files concurrently on a bounded thread pool, so a batch takes
+    about as long as its slowest upload.
+
+    Returns one {"file", "url", "error"} dict per file, in input order;
+    url is None and error holds the reason when that upload failed.
     """
-    if not (YOUTUBE_CLIENT_ID and YOUTUBE_CLIENT_SECRET and YOUTUBE_REFRESH_TOKEN):
-        raise Exception("YouTube environment variables not set!")
+    files = list(files)
 
-    creds = Credentials(
-        token=None,  # no access token yet
-        refresh_token=YOUTUBE_REFRESH_TOKEN,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=YOUTUBE_CLIENT_ID,
-        client_secret=YOUTUBE_CLIENT_SECRET,
-        scopes=SCOPES
-    )
+    if not files:
+        return []
 
-    if not creds.valid:
+    def upload(f):
         try:
-            creds.refresh(Request())
+            return {"file": f, "url": _imgbb_upload(f), "error": None}
         except Exception as e:
-            raise Exception("Failed to refresh YouTube credentials.") from e
+            return {"file": f, "url": None, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as pool:
+        return list(pool.map(upload, files))
 
-    return build("youtube", "v3", credentials=creds, static_discovery=False)
+
+# ---- YouTube Auth ----
+# Refresh the access token this long before Google says it expires
+YOUTUBE_TOKEN_MARGIN = datetime.timedelta(minutes=5)
+
+
+class YouTubeCredentialManager:
+    """
+    Process-wide YouTube credentials. The access token is reused until
+    shortly before it expires and refreshed by one thread at a time;
+    the API service object is built once per thread (httplib2 is not
+    thread-safe) from the bundled discovery document.
+    """
+
+    def __init__(self):
+        self._creds = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _is_fresh(self, creds):
+        if not creds.token or creds.expiry is None:
+            return False
+
+        # google-auth keeps expiry as naive UTC
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return creds.expiry - YOUTUBE_TOKEN_MARGIN > now
+
+    def credentials(self):
+        creds = self._creds
+
+        if creds is not None and self._is_fresh(creds):
+            return creds
+
+        if not (YOUTUBE_CLIENT_ID and YOUTUBE_CLIENT_SECRET and YOUTUBE_REFRESH_TOKEN):
+            raise Exception("YouTube environment variables not set!")
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._creds is None:
+                self._creds = Credentials(
+                    token=None,  # no access token yet
+                    refresh_token=YOUTUBE_REFRESH_TOKEN,
+                    token_uri="https://oauth2.googleapis.com/token",
+                    client_id=YOUTUBE_CLIENT_ID,
+                    client_secret=YOUTUBE_CLIENT_SECRET,
+                    scopes=SCOPES
+                )
+
+            if not self._is_fresh(self._creds):
+                try:
+                    # Refreshed in place, so services built earlier
+                    # pick up the new token too
+                    self._creds.refresh(Request())
+                except Exception as e:
+                    raise Exception("Failed to refresh YouTube credentials.") from e
+
+            return self._creds
+
+    def access_token(self):
+        return self.credentials().token
+
+    def service(self):
+        creds = self.credentials()
+
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = build("youtube", "v3", credentials=creds, static_discovery=True)
+            self._local.service = service
+
+        return service
+
+
+youtube_credentials = YouTubeCredentialManager()
+
+
+def get_youtube_service():
+    """
+    Cached YouTube API service (see YouTubeCredentialManager).
+    """
+    return youtube_credentials.service()
 
 # ---- YouTube Upload ----
 # ---- YouTube Access Token Helper ----
 def get_youtube_access_token():
     """
     Returns a short-lived access token that the frontend can use
-    to upload directly to YouTube.
-    """
-    if not (YOUTUBE_CLIENT_ID and YOUTUBE_CLIENT_SECRET and YOUTUBE_REFRESH_TOKEN):
-        raise Exception("YouTube environment variables not set!")
-
-    creds = Credentials(
-        token=None,
-        refresh_token=YOUTUBE_REFRESH_TOKEN,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=YOUTUBE_CLIENT_ID,
-        client_secret=YOUTUBE_CLIENT_SECRET,
-        scopes=SCOPES,
-    )
-
-    # Refresh to get a new access token
-    creds.refresh(Request())
-    return creds.token
+    to upload directly to YouTube. Cached until shortly before expiry.
+    """
+    return youtube_credentials.access_token()
 
 # ---- Email via Brevo ----
 def send_email(subject, html_content, to_email):
@@ -122,9 +283,19 @@ def send_email(subject, html_content, to_email):
         print("Email send failed:", e)
         return False, str(e)
 
-def upload_to_youtube(video_file, title="Untitled", description=""):
+class YouTubeQuotaExceeded(Exception):
+    """
+    The project's daily YouTube quota (or upload limit) is used up;
+    it resets at midnight Pacific time.
+    """
+
+
+def upload_to_youtube(video_file, title="Untitled", description="", on_progress=None):
     """
-    Uploads a video to YouTube, throws error if daily upload limit is reached.
+    Uploads a video to YouTube in YOUTUBE_CHUNK_SIZE pieces, calling
+    on_progress(percent) after each one. A failed chunk is retried from
+    where it stopped instead of restarting the whole file.
+    Throws error if daily upload limit is reached.
     """
     youtube = get_youtube_service()
 
@@ -140,7 +311,11 @@ def upload_to_youtube(video_file, title="Untitled", description=""):
         },
     }
 
-    media = MediaFileUpload(video_file, chunksize=-1, resumable=True)
+    media = MediaFileUpload(
+        video_file,
+        chunksize=settings.YOUTUBE_CHUNK_SIZE,
+        resumable=True
+    )
 
     try:
         request_upload = youtube.videos().insert(
@@ -148,47 +323,30 @@ def upload_to_youtube(video_file, title="Untitled", description=""):
             body=body,
             media_body=media
         )
-        response = request_upload.execute()
+
+        response = None
+        while response is None:
+            status, response = request_upload.next_chunk(num_retries=3)
+
+            if status and on_progress:
+                on_progress(int(status.progress() * 100))
+
         return response
 
     except HttpError as e:
         error_content = e.content.decode("utf-8") if hasattr(e, "content") else str(e)
 
         if "uploadLimitExceeded" in error_content or "quotaExceeded" in error_content:
-            raise Exception("🚫 Video Upload limit finished for today. Upload only images or check back in 24hrs")
+            raise YouTubeQuotaExceeded("🚫 Video Upload limit finished for today. Upload only images or check back in 24hrs")
         else:
             raise
-from django.utils import timezone
-
-from .models import Store, Subscription
+from .services.entitlements import is_store_active
 
 
 def store_is_suspended(store):
     """
     Returns True if this store should be suspended.
+    Uses the owner's cached entitlement record (no queries when warm).
     """
 
-    owner = store.owner
-
-    sub = Subscription.objects.filter(
-        user=owner
-    ).first()
-
-    # Premium with valid subscription
-    if (
-        sub
-        and sub.is_active
-        and sub.plan in ["premium_monthly", "premium_yearly"]
-        and sub.expires_at
-        and sub.expires_at > timezone.now()
-    ):
-        return False
-
-    first_store = (
-        Store.objects
-        .filter(owner=owner)
-        .order_by("created_at")
-        .first()
-    )
-
-    return first_store and first_store.id != store.id
\ No newline at end of file
+    return not is_store_active(store)
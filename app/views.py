@@ -6,7 +6,11 @@ from django.contrib.auth.decorators import login_required
 from django import forms
 from django.forms import modelformset_factory
 from django.utils.text import slugify
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import FileResponse, HttpResponseForbidden, HttpResponseNotModified, JsonResponse
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+import mimetypes
+import os
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
@@ -21,7 +25,8 @@ import logging
 from utils.validators import validate_file_size
 logger = logging.getLogger(__name__)
 from .models import (
-    Store, StoreImage, Item, ItemView, EmailOTP, ProductMedia, ItemLike, Comment
+    Store, StoreImage, Item, EmailOTP, ProductMedia, Comment,
+    VideoUpload
 )
 from .models import WithdrawalRequest
 
@@ -34,13 +39,30 @@ from .utils import upload_to_imgbb, upload_to_youtube
 from utils.email_service import send_email
 from .models import Notification
 from django.conf import settings
-from rapidfuzz import process
 
 from django.urls import reverse
 from django.templatetags.static import static
 from django.db.models import Q
 import re
 from app.models import Cart, CartItem, Order, OrderItem
+from .services.store_registry import get_store_registry, invalidate_user_stores
+from .services.impressions import record_impression
+from .services import counters
+from .services.likes import get_liked_item_ids, toggle_like
+from .services.covers import cover_or_placeholder, with_covers
+from .services.feed import fair_mix_ids, fetch_items, marketplace_items, new_seed
+from .services.search_index import product_index, store_index
+from .services.search import search_items, search_stores
+from .services.store_cache import get_store_by_slug
+from .services.suggest import suggest
+from .services.images import optimize_image, optimized_file
+from .storage import CAS_PREFIX
+from .services.paystack import paystack
+from .services.banks import bank_name, get_banks, resolve_account
+from .services.paystack_events import store_event, valid_signature
+from .services.settlement import SettlementError, settle_order, settle_subscription
+from .services.uploads import process_now, queue_item_image, queue_store_image, upload_status
+from .services.video_uploads import UploadError, append_chunk, attach_uploads, create_upload, video_status
 # -------------------------
 # Forms
 # -------------------------
@@ -105,18 +127,11 @@ def home(request):
     # NORMAL HOME LOGIC (UNCHANGED)
     # ----------------------------------
     if request.user.is_authenticated:
-        stores = Store.objects.filter(owner=request.user).order_by("id")
-
-        # Try active store from session
-        active_store_id = request.session.get("active_store_id")
-        if active_store_id:
-            store = stores.filter(id=active_store_id).first()
+        registry = get_store_registry(request)
+        stores = registry.stores
 
-        # Fallback to first store if no active store
-        if not store:
-            store = stores.first()
-            if store:
-                request.session["active_store_id"] = store.id
+        # Active store from session, falling back to the first store
+        store = registry.active_store
 
     return render(request, "home.html", {
         "store": store,
@@ -128,14 +143,14 @@ def home(request):
 def about(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, 'about.html', {'store': store})
 
 def profile(request):
     if not request.user.is_authenticated:
         return render(request, "login")
     
-    store = Store.objects.filter(owner=request.user).first()
+    store = get_store_registry(request).first_store
     unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
 
     context = {
@@ -148,14 +163,14 @@ def profile(request):
 def problem_solving(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "problem_solving.html", {'store': store})
 
 
 def money(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "money.html", {'store': store})
 
 # def notifications(request):
@@ -167,50 +182,50 @@ def money(request):
 def create_tutorial(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "create_tutorial.html", {'store': store})
 
 
 def share_tutorial(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "share_tutorial.html", {'store': store})
 
 
 def faqs(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "faq.html", {'store': store})
 
 
 def contact(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "contact.html", {'store': store})
 
 
 def privacy(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "privacy_policy.html", {'store': store})
 def terms_of_service(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "terms_of_service.html", {'store': store})
 def cookies_policy(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, "cookies_policy.html", {'store': store})
 def security_settings(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     return render(request, 'security_settings.html', {'store': store})
 
 
@@ -218,7 +233,7 @@ def security_settings(request):
 def account_information(request):
     store = None
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     user = request.user
     context = {
         'user': user,
@@ -336,22 +351,20 @@ from .services.permissions import check_store_limit  # 👈 IMPORTANT
 def create_store(request, slug=None):
 
     store = None
+    registry = get_store_registry(request)
 
     if slug:
-        store = get_object_or_404(
-            Store,
-            slug=slug,
-            owner=request.user
-        )
+        store = registry.get_by_slug(slug)
+
+        if not store:
+            raise Http404("Store not found.")
 
     # =========================
     # PLAN LIMIT CHECK
     # =========================
     if request.method == "POST" and not store:
 
-        current_store_count = Store.objects.filter(
-            owner=request.user
-        ).count()
+        current_store_count = len(registry.stores)
 
         if not check_store_limit(
             request.user,
@@ -391,12 +404,16 @@ def create_store(request, slug=None):
             # =========================
             if request.FILES.get("brand_logo"):
 
-                image_url = upload_to_imgbb(
-                    request.FILES["brand_logo"]
-                )
+                # Resized, metadata-free WebP instead of the raw photo
+                logo = optimized_file(request.FILES["brand_logo"])
 
-                if image_url:
-                    store.brand_logo_url = image_url
+                if settings.IMGBB_ENABLED:
+                    image_url = upload_to_imgbb(logo)
+
+                    if image_url:
+                        store.brand_logo_url = image_url
+                else:
+                    store.brand_logo = logo
 
             # =========================
             # Generate slug
@@ -426,6 +443,8 @@ def create_store(request, slug=None):
 
             store.save()
 
+            invalidate_user_stores(request)
+
             return redirect(
                 "manage_store",
                 slug=store.slug
@@ -452,7 +471,7 @@ from django.http import HttpResponse
 from django.db.models import Q
 from django.templatetags.static import static
 from types import SimpleNamespace
-from .models import Store, Item, ItemView
+from .models import Store, Item
 
 logger = logging.getLogger(__name__)
 
@@ -490,17 +509,8 @@ def view_store(request, slug=None):
         # -------------------------------
         query = request.GET.get("q")
         if query:
-            items_qs = items_qs.filter(
-                Q(name__icontains=query) |
-                Q(description__icontains=query)
-            )
-
-        # -------------------------------
-        # Session
-        # -------------------------------
-        if not request.session.session_key:
-            request.session.create()
-        session_key = request.session.session_key
+            # Ranked full-text matches within this store
+            items_qs = fetch_items(search_items(query, store_id=store.id))
 
         # -------------------------------
         # Store views tracking
@@ -508,50 +518,41 @@ def view_store(request, slug=None):
         if request.user != store.owner:
             viewed_key = f"viewed_store_{store.id}"
             if not request.session.get(viewed_key):
-                store.total_views += 1
-                store.save(update_fields=["total_views"])
+                counters.increment(store.id, "total_views")
                 request.session[viewed_key] = True
 
-        # -------------------------------
-        # Helper: image
-        # -------------------------------
-        def get_cover(item):
-            if item.image_url:
-                return item.image_url
-            if item.image:
-                return item.image.url
-            return static("images/no-image.png")
-
         # -------------------------------
         # Build items_meta
         # -------------------------------
-        items_meta = []
-        for item in items_qs:
-            if not ItemView.objects.filter(item=item, session_key=session_key).exists():
-                item.views += 1
-                item.save(update_fields=["views"])
-                ItemView.objects.create(
-                    item=item,
-                    user=request.user if request.user.is_authenticated else None,
-                    session_key=session_key
-                )
+        liked_ids = get_liked_item_ids(request.user)
 
+        items_meta = []
+        for item in with_covers(items_qs):
             items_meta.append({
                 "item": item,
-                "cover_url": get_cover(item),
-                "likes_count": item.likes.count(),
-                "user_liked": (
-                    request.user.is_authenticated and
-                    item.likes.filter(id=request.user.id).exists()
-                )
+                "cover_url": cover_or_placeholder(item),
+                "likes_count": item.like_count,
+                "user_liked": item.id in liked_ids,
             })
 
+        # -------------------------------
+        # Item views tracking
+        # -------------------------------
+        # One impression row per page view; process_impressions
+        # folds these into Item.views / ItemView in bulk.
+        record_impression(
+            request,
+            store,
+            [meta["item"].id for meta in items_meta]
+        )
+
         # -------------------------------
         # Share / meta
         # -------------------------------
         full_url = request.build_absolute_uri()
         whatsapp_link = f"https://wa.me/{store.whatsapp_number}" if store.whatsapp_number else ""
         og_image = request.build_absolute_uri(items_meta[0]["cover_url"]) if items_meta else request.build_absolute_uri(static("images/logo.png"))
+        store.total_orders = counters.get_total(store, "total_orders")
 
         return render(request, "store/view_store.html", {
             "store": store,
@@ -580,23 +581,16 @@ def manage_store(request, slug, item_id=None):
         your_email = "*"
         stores = []
         active_store = None
+        registry = get_store_registry(request)
 
         if request.user.email == your_email:
-            stores = Store.objects.filter(owner=request.user).order_by("id")
-            active_store_id = request.session.get("active_store_id")
-
-            if active_store_id:
-                active_store = Store.objects.filter(
-                    id=active_store_id,
-                    owner=request.user
-                ).first()
-
-            if not active_store and stores.exists():
-                active_store = stores.first()
-                request.session["active_store_id"] = active_store.id
+            stores = registry.stores
+            active_store = registry.active_store
 
         # ---------------------- GET STORE ----------------------
-        store = get_object_or_404(Store, slug=slug, owner=request.user)
+        store = registry.get_by_slug(slug)
+        if not store:
+            raise Http404("Store not found.")
         active_store = store
         # ---------------------- TEMPLATE SAFE FALLBACK ----------------------
         template_slug = getattr(store.template, "slug", "starter")
@@ -619,6 +613,7 @@ def manage_store(request, slug, item_id=None):
         extra_files = request.FILES.getlist("extra_images")
         cover_file = request.FILES.get("image")
         product = None
+        queued_uploads = []
 
         if request.method == "POST":
 
@@ -665,20 +660,20 @@ def manage_store(request, slug, item_id=None):
                     product.currency = request.POST.get("currency", "₦")
 
                     # ---- Cover Upload ----
+                    # Saved locally with the form (and shown straight away);
+                    # process_uploads moves it to ImgBB in the background.
                     if cover_file:
-                        try:
-                            uploaded_url = upload_to_imgbb(cover_file)
-                            if uploaded_url:
-                                product.image_url = uploaded_url
-
-                            if product.image:
-                                product.image.delete(save=False)
-
-                        except Exception as e:
-                            messages.warning(request, f"Cover image upload failed: {e}")
+                        product.image_url = None
+                        optimize_image(product, cover_file, "item_images")
+                    elif "image" in form.changed_data:
+                        # Cover cleared: its variants go with it
+                        product.image_variants = {}
 
                     product.save()
 
+                    if cover_file and settings.IMGBB_ENABLED:
+                        queued_uploads.append(queue_item_image(product))
+
             else:
                 messages.error(request, form.errors)
 
@@ -688,16 +683,17 @@ def manage_store(request, slug, item_id=None):
                     try:
                         # ---------- IMAGE HANDLING ----------
                         if f.content_type.startswith("image/"):
-                            img_url = upload_to_imgbb(f)
-
-                            if img_url:
-                                StoreImage.objects.create(
-                                    store=store,
-                                    item=product,
-                                    image_url=img_url,
-                                    name=product.name,
-                                    price=product.price
-                                )
+                            extra = StoreImage(
+                                store=store,
+                                item=product,
+                                image=f,
+                                name=product.name,
+                                price=product.price
+                            )
+                            optimize_image(extra, f, "store_images")
+                            extra.save()
+                            if settings.IMGBB_ENABLED:
+                                queued_uploads.append(queue_store_image(extra))
 
                     except Exception as e:
                         messages.warning(
@@ -705,6 +701,22 @@ def manage_store(request, slug, item_id=None):
                             f"Failed to process {getattr(f, 'name', 'file')}: {e}"
                         )
 
+                # ---------- SYNCHRONOUS UPLOADS (ALL IMAGES AT ONCE) ----------
+                if queued_uploads and not settings.MEDIA_UPLOADS_ASYNC:
+                    process_now(queued_uploads)
+
+                # ---------- VIDEO HANDLING (RESUMABLE UPLOADS) ----------
+                # Videos were uploaded to us in chunks before the form was
+                # submitted; process_video_uploads sends them to YouTube.
+                queued_videos = attach_uploads(
+                    product, request.POST.getlist("video_upload_ids")
+                )
+                if queued_videos:
+                    messages.info(
+                        request,
+                        f"{queued_videos} video(s) are being processed and will appear shortly."
+                    )
+
                 # ---------- VIDEO HANDLING (FROM FRONTEND YOUTUBE UPLOAD) ----------
                 youtube_ids = request.POST.getlist("youtube_ids")
                 youtube_urls = request.POST.getlist("youtube_urls")
@@ -757,6 +769,174 @@ def manage_store(request, slug, item_id=None):
         )
 
 
+# Seller uploads shown in the page; anything else (SVG, HTML, PDF...) is
+# only ever downloaded, so it can't run script on this origin
+INLINE_MEDIA_TYPES = {
+    "image/jpeg", "image/png", "image/gif", "image/webp", "image/avif",
+    "video/mp4", "video/webm", "video/quicktime", "video/ogg",
+}
+
+
+def serve_media(request, path):
+    """
+    Content-addressed media (MEDIA_ROOT/cas/...). The file name is the
+    hash of its bytes, so responses are immutable and cached for a year.
+    FileResponse hands the open file to the server's wsgi.file_wrapper
+    (sendfile) rather than reading it through Python.
+
+    Only INLINE_MEDIA_TYPES are served inline; the type comes from the
+    uploader's extension, so everything else is sent as an attachment.
+    """
+    digest = os.path.splitext(os.path.basename(path))[0]
+    etag = f'"{digest}"'
+
+    # A pruned file is gone for everyone, cached ETag or not
+    try:
+        full_path = default_storage.path(f"{CAS_PREFIX}/{path}")
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(full_path)
+
+        if content_type in INLINE_MEDIA_TYPES:
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+        else:
+            response = FileResponse(
+                open(full_path, "rb"),
+                content_type="application/octet-stream",
+                as_attachment=True,
+                filename=os.path.basename(full_path),
+            )
+
+    response["ETag"] = etag
+    response["X-Content-Type-Options"] = "nosniff"
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+@login_required
+def media_upload_status(request, slug):
+    """
+    Polled by the dashboard while background image uploads run.
+    """
+    store = get_store_registry(request).get_by_slug(slug)
+    if not store:
+        raise Http404("Store not found.")
+
+    return JsonResponse(upload_status(store))
+
+
+TUS_VERSION = "1.0.0"
+
+
+def _tus_metadata(header):
+    """
+    Upload-Metadata: "filename d2FscC5tcDQ=,filetype dmlkZW8vbXA0"
+    """
+    metadata = {}
+
+    for pair in filter(None, (p.strip() for p in header.split(","))):
+        key, _, value = pair.partition(" ")
+        try:
+            metadata[key] = base64.b64decode(value).decode("utf-8")
+        except (ValueError, UnicodeDecodeError):
+            metadata[key] = ""
+
+    return metadata
+
+
+def _tus_response(upload, status=204):
+    response = HttpResponse(status=status)
+    response["Tus-Resumable"] = TUS_VERSION
+    response["Upload-Offset"] = str(upload.offset)
+    response["Upload-Length"] = str(upload.size)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+@login_required
+def video_upload_create(request, slug):
+    """
+    Starts a resumable (tus-style) video upload:
+    POST with Upload-Length -> 201 + Location of the upload.
+    """
+    if request.method != "POST":
+        return HttpResponse(status=405)
+
+    store = get_store_registry(request).get_by_slug(slug)
+    if not store:
+        raise Http404("Store not found.")
+
+    metadata = _tus_metadata(request.headers.get("Upload-Metadata", ""))
+
+    try:
+        upload = create_upload(
+            store,
+            int(request.headers.get("Upload-Length", 0)),
+            filename=metadata.get("filename", ""),
+            content_type=metadata.get("filetype", ""),
+        )
+    except ValueError:
+        return HttpResponse("Upload-Length is required", status=400)
+    except UploadError as e:
+        return HttpResponse(str(e), status=e.status)
+
+    response = _tus_response(upload, status=201)
+    response["Location"] = reverse(
+        "video_upload_detail",
+        kwargs={"slug": slug, "token": upload.token}
+    )
+    return response
+
+
+@login_required
+def video_upload_detail(request, slug, token):
+    """
+    HEAD  -> Upload-Offset (how much the server has, to resume from)
+    PATCH -> append the body at Upload-Offset
+    GET   -> JSON status, including the YouTube upload progress
+    """
+    store = get_store_registry(request).get_by_slug(slug)
+    if not store:
+        raise Http404("Store not found.")
+
+    upload = get_object_or_404(VideoUpload, token=token, store=store)
+
+    if request.method == "HEAD":
+        return _tus_response(upload, status=200)
+
+    if request.method == "GET":
+        return JsonResponse(video_status(upload))
+
+    if request.method != "PATCH":
+        return HttpResponse(status=405)
+
+    if request.content_type != "application/offset+octet-stream":
+        return HttpResponse(status=415)
+
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return HttpResponse("Upload-Offset is required", status=400)
+
+    try:
+        # Read from the request stream, never request.body: the chunk
+        # goes to disk without being held in memory.
+        upload = append_chunk(upload, offset, request)
+    except UploadError as e:
+        response = _tus_response(upload, status=e.status)
+        response.content = str(e)
+        return response
+
+    return _tus_response(upload)
+
+
 @login_required
 def delete_item(request, slug, item_id):
     store = get_object_or_404(Store, slug=slug, owner=request.user)
@@ -868,44 +1048,17 @@ def product_detail(request, slug):
         except Exception:
             continue
 
-    # -------------------------------
-    # Helper: get cover image URL
-    # -------------------------------
-    def get_cover_url(item):
-        if item.image_url:
-            return item.image_url
-        if item.image:
-            try:
-                return item.image.url
-            except Exception:
-                pass
-        extra = StoreImage.objects.filter(store=store, name=item.name).first()
-        if extra:
-            if extra.image_url:
-                return extra.image_url
-            if extra.file:
-                try:
-                    return extra.file.url
-                except Exception:
-                    pass
-        pm = ProductMedia.objects.filter(product=item).first()
-        if pm:
-            if pm.file:
-                return pm.file.url
-            if pm.youtube_id:
-                return f"https://img.youtube.com/vi/{pm.youtube_id}/hqdefault.jpg"
-        return '/static/images/no-image.png'
-
     # -------------------------------
     # Fetch 5 other products from the same store
     # -------------------------------
-    other_items = Item.objects.filter(store=store).exclude(id=product.id)[:5]
+    other_items = with_covers(
+        Item.objects.filter(store=store).exclude(id=product.id)[:5]
+    )
     items_meta = []
     for item in other_items:
-        cover_url = get_cover_url(item)
         items_meta.append({
             'item': item,
-            'cover_url': cover_url,
+            'cover_url': cover_or_placeholder(item),
             'product_url': request.build_absolute_uri(
                 reverse('product_detail', kwargs={'slug': item.slug})
             ),
@@ -935,28 +1088,22 @@ def product_detail(request, slug):
 @login_required
 def like_item(request, item_id):
     try:
-        item = Item.objects.get(id=item_id)
+        item = Item.objects.select_related("store").get(id=item_id)
     except Item.DoesNotExist:
         return JsonResponse({'error': 'Item not found'}, status=404)
 
-    # Toggle like
-    liked_instance, created = ItemLike.objects.get_or_create(item=item, user=request.user)
-    if not created:
-        liked_instance.delete()
-        liked_state = False
-    else:
-        liked_state = True
+    # Toggle like (updates Item.like_count in the same transaction)
+    liked_state, likes_count = toggle_like(item, request.user)
 
+    if liked_state:
         # ✅ Create notification if liked
-        if request.user != item.store.owner:  # don't notify yourself
+        if request.user.id != item.store.owner_id:  # don't notify yourself
             Notification.objects.create(
-                user=item.store.owner,
+                user_id=item.store.owner_id,
                 message=f"{request.user.username} liked your product: {item.name}",
                 link=request.build_absolute_uri(item.get_absolute_url())
             )
 
-    likes_count = item.likes.count() if hasattr(item, 'likes') else 0
-
     return JsonResponse({
         'liked': liked_state,
         'likes': likes_count
@@ -1039,9 +1186,7 @@ from django.shortcuts import render
 @login_required
 def notifications_view(request):
 
-    store = Store.objects.filter(
-        owner=request.user
-    ).first()
+    store = get_store_registry(request).first_store
 
     notifications = request.user.notifications.order_by(
         "-created_at"
@@ -1149,59 +1294,64 @@ from .models import Store, Item
 
 
 def store_search(request):
-    query = request.GET.get("q", "")
+    query = request.GET.get("q", "").strip()
     stores = []
+    page_obj = None
     if query:
-        all_names = list(Store.objects.values_list("brand_name", flat=True))
-
-        if all_names:
-            # Only keep matches with score >= 60
-            matches = process.extract(query, all_names, limit=10, score_cutoff=60)
+        # Ranked full-text matches; fuzzy index catches typos
+        ids = search_stores(query) or store_index.search(query, limit=10)
 
-            # Extract names only
-            matched_names = [m[0] for m in matches]
-
-            # Query only those stores
-            stores = Store.objects.filter(brand_name__in=matched_names)
-
-        # fallback to icontains if fuzzy gave nothing
-        if not stores.exists():
-            stores = Store.objects.filter(
-                Q(brand_name__icontains=query) | Q(Bio__icontains=query)
-            )
+        page_obj = Paginator(ids, 20).get_page(request.GET.get("page"))
+        found = Store.objects.in_bulk(page_obj.object_list)
+        stores = [found[i] for i in page_obj.object_list if i in found]
 
     return render(request, "store_search.html", {
         "query": query,
-        "stores": stores
+        "stores": stores,
+        "page_obj": page_obj,
     })
 
 
 def product_search(request):
-    query = request.GET.get("q", "")
+    query = request.GET.get("q", "").strip()
     results = []
+    page_obj = None
     if query:
-        # ✅ grab all product names
-        all_names = list(Item.objects.values_list("name", flat=True))
+        # ✅ ranked full-text matches; fuzzy index catches typos
+        ids = search_items(query) or product_index.search(query, limit=15)
+
+        # ✅ only the rows on this page are loaded
+        page_obj = Paginator(ids, 24).get_page(request.GET.get("page"))
+        results = with_covers(fetch_items(page_obj.object_list))
 
-        if all_names:
-            # ✅ fuzzy match with score threshold
-            matches = process.extract(query, all_names, limit=15, score_cutoff=60)
+    return render(request, "search/product_results.html", {
+        "query": query,
+        "results": results,
+        "page_obj": page_obj,
+    })
 
-            # ✅ get just the matched names
-            matched_names = [m[0] for m in matches]
 
-            # ✅ query DB for those items (and pull related store in one go)
-            results = Item.objects.filter(name__in=matched_names).select_related("store")
+def search_suggest(request):
+    """
+    Search-as-you-type: JSON suggestions from the in-memory prefix trie.
+    On a storefront (subdomain, or ?store=<slug>) only that store's
+    products are suggested.
+    """
+    query = request.GET.get("q", "")
 
-        # ✅ fallback if no fuzzy result
-        if not results:
-            results = Item.objects.filter(
-                Q(name__icontains=query) | Q(description__icontains=query)
-            ).select_related("store")
+    store = getattr(request, "store", None)
+    store_slug = request.GET.get("store")
+    if not store and store_slug:
+        store = get_store_by_slug(store_slug)
 
-    return render(request, "search/product_results.html", {
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 8)), 8))
+    except ValueError:
+        limit = 8
+
+    return JsonResponse({
         "query": query,
-        "results": results
+        "results": suggest(query, store_id=store.id if store else None, limit=limit),
     })
 from django.views.decorators.csrf import csrf_exempt
 
@@ -1216,8 +1366,7 @@ def record_order(request, store_id):
         # Same response as success path — don't leak existence of the ID
         return JsonResponse({"success": True})
 
-    store.total_orders += 1
-    store.save(update_fields=["total_orders"])
+    counters.increment(store.id, "total_orders")
     return JsonResponse({"success": True})
 import random
 from itertools import chain, product
@@ -1228,37 +1377,7 @@ from django.core.paginator import Paginator       # ⭐ ADDED
 from .models import Item
 
 
-# 🔥 MINI-AI CATEGORY KEYWORD MAP
-CATEGORY_KEYWORDS = {
-    "food": [
-        "food", "meal", "snack", "drink", "cake", "bread", "pizza", "burger",
-        "chicken", "donut", "doughnut", "rice", "fruit", "vegetable", "beverage"
-    ],
-    "clothing": [
-        "shirt", "t-shirt", "cloth", "clothes", "jeans", "jacket", "hoodie",
-        "dress", "shoe", "sneaker", "cap", "baggy", "shorts"
-    ],
-    "tech": [
-        "laptop", "phone", "computer", "tablet", "charger", "earbuds",
-        "headset", "smartwatch", "keyboard", "mouse"
-    ],
-    "home": [
-        "sofa", "chair", "bed", "furniture", "table", "home", "decor",
-        "cookware", "pot", "pan", "pillow"
-    ],
-    "beauty": [
-        "cream", "makeup", "skincare", "lotion", "perfume", "lipstick",
-        "hair", "beauty", "cosmetic"
-    ],
-    "gaming": [
-        "game", "gaming", "controller", "console", "playstation",
-        "xbox", "nintendo"
-    ],
-    "accessories": [
-        "bag", "belt", "watch", "jewelry", "ring", "bracelet",
-        "necklace", "wallet", "accessory"
-    ],
-}
+from .services.categorizer import CATEGORY_KEYWORDS
 
 
 def marketplace_view(request):
@@ -1269,77 +1388,57 @@ def marketplace_view(request):
     # 🔥 FIX: Avoid MultipleObjectsReturned
     # ===========================================================
     if request.user.is_authenticated:
-        store = Store.objects.filter(owner=request.user).first()
+        store = get_store_registry(request).first_store
     else:
         store = None
 
     # ===========================================================
-    # 🔥 Get all active products
+    # 🔥 Active products (only their ids are read, see services/feed)
     # ===========================================================
-    products = (
-    Item.objects
-    .select_related("store")
-    .filter(
-        store__is_demo=False
-    )
-    .order_by("-created_at")
-    )
+    products = marketplace_items()
 
     # ===========================================================
     # 🔥 SEARCH FILTER
     # ===========================================================
     if query:
         products = products.filter(
-            Q(name__icontains=query)
-            | Q(description__icontains=query)
-            | Q(store__brand_name__icontains=query)
-        ).distinct()
+            Q(id__in=search_items(query))
+            | Q(store_id__in=search_stores(query))
+        )
 
     # ===========================================================
     # 🔥 CATEGORY FILTER (AI)
     # ===========================================================
     if category and category in CATEGORY_KEYWORDS:
-        keywords = CATEGORY_KEYWORDS[category]
-
-        q_objects = Q()
-        for kw in keywords:
-            q_objects |= Q(name__icontains=kw) | Q(description__icontains=kw)
-
-        products = products.filter(q_objects).distinct()
+        # Indexed lookup on ItemCategory (see services/categorizer)
+        products = products.filter(categories__category=category)
 
     # ===========================================================
     # ⭐ FAIR-MIX RANDOMIZATION
     # ===========================================================
-    store_groups = {}
-    for p in products:
-        store_id = p.store_id if p.store else 0
-        store_groups.setdefault(store_id, []).append(p)
-
-    mixed = []
-    for store_id, items in store_groups.items():
-        random.shuffle(items)
-        mixed.extend(items[:4])
+    # A fresh landing gets a new shuffle; paging and live search pass the
+    # seed back in the query string (no session for anonymous visitors).
+    try:
+        seed = int(request.GET.get("seed", ""))
+    except ValueError:
+        seed = None
+    if not seed or not 0 < seed < 2 ** 31:
+        seed = new_seed()
+    is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
 
-    random.shuffle(mixed)
+    mixed_ids = fair_mix_ids(products, seed, query, category)
 
     # ===========================================================
     # 🔥 AJAX RESPONSE
     # ===========================================================
-    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+    if is_ajax:
         data = []
-        for p in mixed[:12]:
-            if p.image:
-                image_link = p.image.url
-            elif p.image_url:
-                image_link = p.image_url
-            else:
-                image_link = "/static/images/placeholder.png"
-
+        for p in with_covers(fetch_items(mixed_ids[:12])):
             data.append({
                 "id": p.id,
                 "name": p.name,
                 "price": f"{p.price} {p.currency}",
-                "image": image_link,
+                "image": p.cover_url or "/static/images/placeholder.png",
                 "store_name": p.store.brand_name if p.store else "Unknown Store",
                 "product_url": p.get_absolute_url(),
                 "store_url": p.store.get_absolute_url() if p.store else "#",
@@ -1350,9 +1449,10 @@ def marketplace_view(request):
     # ===========================================================
     # ⭐⭐⭐ PAGINATION
     # ===========================================================
-    paginator = Paginator(mixed, 18)
+    paginator = Paginator(mixed_ids, 18)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = with_covers(fetch_items(page_obj.object_list))
 
     # ===========================================================
     # 🔥 NORMAL RENDER
@@ -1363,6 +1463,7 @@ def marketplace_view(request):
         "query": query,
         "store": store,
         "category": category,
+        "seed": seed,
     })
 
 
@@ -1380,7 +1481,8 @@ def custom_400(request, exception):
 @login_required
 def switch_store(request, store_id):
     store = get_object_or_404(Store, id=store_id, owner=request.user)
-    request.session['active_store'] = store.id
+    request.session['active_store_id'] = store.id
+    invalidate_user_stores(request)
     messages.success(request, f'Switched to store: {store.brand_name}')
     return redirect('manage_store', slug=store.slug)
 
@@ -1396,6 +1498,8 @@ def delete_store(request, store_id):
         if request.session.get("active_store_id") == store_id:
             request.session["active_store_id"] = None
 
+        invalidate_user_stores(request)
+
         return JsonResponse({"status": "success"})
 
     return JsonResponse({"status": "error", "message": "Invalid method"}, status=400)
@@ -1505,7 +1609,7 @@ class StoreHomeView(View):
 
         resolved_template = get_store_template(store)
 
-        products = Item.objects.filter(store=store)
+        products = with_covers(Item.objects.filter(store=store))
 
         return render(
             request,
@@ -1592,9 +1696,9 @@ class ProductListView(View):
 
         resolved_template = get_store_template(store)
 
-        products = Item.objects.filter(
+        products = with_covers(Item.objects.filter(
             store=store
-        )
+        ))
 
         return render(
             request,
@@ -1633,20 +1737,17 @@ class ProductDetailView(View):
             slug=product_slug,
             store=store
         )
+        with_covers([product])
 
-        products = Item.objects.filter(
+        products = with_covers(Item.objects.filter(
             store=store
-        )
+        ))
 
         extra_files = product.extra_files.all()
         media = product.media.all()
         comments = product.comments.all()
 
-        items_meta = (
-            Item.objects
-            .filter(store=store)
-            .exclude(pk=product.pk)[:8]
-        )
+        items_meta = [p for p in products if p.pk != product.pk][:8]
 
         resolved_template = get_store_template(store)
 
@@ -1737,15 +1838,6 @@ def paystack_initialize(request):
         status="pending"
     )
 
-    url = "https://api.paystack.co/transaction/initialize"
-
-    headers = {
-        "Authorization":
-            f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type":
-            "application/json",
-    }
-
     data = {
         "email": user.email,
         "amount": amount,
@@ -1759,13 +1851,7 @@ def paystack_initialize(request):
         }
     }
 
-    response = requests.post(
-        url,
-        json=data,
-        headers=headers
-    )
-
-    res = response.json()
+    res = paystack.initialize_transaction(**data)
 
     if res.get("status"):
         return redirect(
@@ -1777,8 +1863,6 @@ def paystack_initialize(request):
     )
 import requests
 
-from datetime import timedelta
-
 from django.conf import settings
 from django.shortcuts import render
 from django.utils import timezone
@@ -1801,23 +1885,8 @@ def payment_success(request):
             }
         )
 
-    url = (
-        "https://api.paystack.co/"
-        f"transaction/verify/{reference}"
-    )
-
-    headers = {
-        "Authorization":
-            f"Bearer {settings.PAYSTACK_SECRET_KEY}"
-    }
-
     try:
-        response = requests.get(
-            url,
-            headers=headers
-        )
-
-        res = response.json()
+        res = paystack.verify_transaction(reference)
 
         if (
             res.get("status")
@@ -1832,56 +1901,15 @@ def payment_success(request):
             )
 
             # ==========================
-            # UPDATE SUBSCRIPTION
+            # UPDATE SUBSCRIPTION + PAYMENT RECORD
             # ==========================
-            sub, _ = (
-                Subscription.objects
-                .get_or_create(
-                    user=request.user
-                )
+            # (the webhook may already have done this)
+            sub, _ = settle_subscription(
+                request.user.id,
+                purchased_plan,
+                reference
             )
 
-            sub.is_active = True
-            sub.started_at = timezone.now()
-
-            if purchased_plan == "premium_yearly":
-
-                sub.plan = "premium_yearly"
-
-                sub.expires_at = (
-                    timezone.now()
-                    + timedelta(days=365)
-                )
-
-            else:
-
-                sub.plan = "premium_monthly"
-
-                sub.expires_at = (
-                    timezone.now()
-                    + timedelta(days=30)
-                )
-
-            sub.last_payment_reference = reference
-
-            sub.save()
-
-            # ==========================
-            # UPDATE PAYMENT RECORD
-            # ==========================
-            payment = (
-                Payment.objects
-                .filter(
-                    reference=reference
-                )
-                .first()
-            )
-
-            if payment:
-                payment.status = "success"
-                payment.paid_at = timezone.now()
-                payment.save()
-
             return render(
                 request,
                 "payment/success.html",
@@ -1909,9 +1937,6 @@ def payment_success(request):
                 "Payment verification failed."
         }
     )
-import json
-import hmac
-import hashlib
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
@@ -1922,74 +1947,29 @@ from .models import Subscription
 
 @csrf_exempt
 def paystack_webhook(request):
+    """
+    Verifies and stores the event, then acknowledges straight away;
+    process_paystack_events applies it. A repeat delivery is
+    acknowledged without being stored or applied again.
+    """
     payload = request.body
 
     signature = request.headers.get("x-paystack-signature")
 
-    computed_hash = hmac.new(
-        settings.PAYSTACK_SECRET_KEY.encode(),
-        payload,
-        hashlib.sha512
-    ).hexdigest()
-
-    if not signature or not hmac.compare_digest(computed_hash, signature):
+    if not valid_signature(payload, signature):
         return JsonResponse(
             {"error": "Invalid signature"},
             status=400
         )
 
-    event = json.loads(payload)
-
-    if event.get("event") != "charge.success":
-        return JsonResponse({"status": "ignored"})
-
-    data = event["data"]
-
-    metadata = data.get("metadata", {})
-
-    user_id = metadata.get("user_id")
-    plan = metadata.get("plan")
-    reference = data.get("reference")
-
-    if not user_id:
-        return JsonResponse({"error": "Missing user id"}, status=400)
-
     try:
-        user = User.objects.get(id=user_id)
-
-        sub, _ = Subscription.objects.get_or_create(user=user)
+        event, created = store_event(payload)
+    except ValueError:
+        return JsonResponse({"error": "Invalid payload"}, status=400)
 
-        sub.is_active = True
-        sub.started_at = timezone.now()
-
-        if plan == "premium_yearly":
-            sub.plan = "premium_yearly"
-            sub.expires_at = timezone.now() + timedelta(days=365)
-
-        else:
-            sub.plan = "premium_monthly"
-            sub.expires_at = timezone.now() + timedelta(days=30)
-
-        sub.last_payment_reference = reference
-
-        sub.save()
-
-        payment = Payment.objects.filter(
-            reference=reference
-        ).first()
-
-        if payment:
-            payment.status = "success"
-            payment.paid_at = timezone.now()
-            payment.save()
-
-    except User.DoesNotExist:
-        return JsonResponse(
-            {"error": "User not found"},
-            status=404
-        )
-
-    return JsonResponse({"status": "success"})
+    return JsonResponse({
+        "status": "received" if created else "duplicate"
+    })
 @login_required
 def pricing(request):
     return render(request, "pricing.html")
@@ -2147,13 +2127,6 @@ def store_checkout(request, slug):
 
     if request.method == "POST":
 
-        headers = {
-            "Authorization":
-                f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-            "Content-Type":
-                "application/json",
-        }
-
         payload = {
             "email":
                 request.POST["email"],
@@ -2188,13 +2161,7 @@ def store_checkout(request, slug):
             },
         }
 
-        response = requests.post(
-            "https://api.paystack.co/transaction/initialize",
-            json=payload,
-            headers=headers,
-        )
-
-        res = response.json()
+        res = paystack.initialize_transaction(**payload)
 
         if res["status"]:
             return redirect(
@@ -2218,19 +2185,40 @@ from django.contrib import messages
 from .models import Cart, CartItem, Item
 
 
-def get_cart(request):
+def get_cart(request, create=False):
     """
-    Returns the current session cart.
-    Creates one if it doesn't exist.
+    Returns the current session cart, or None if there isn't one.
+    Only add-to-cart passes create=True, so browsing never creates
+    a session or a Cart row.
     """
     if not request.session.session_key:
+
+        if not create:
+            return None
+
         request.session.create()
 
-    cart, created = Cart.objects.get_or_create(
+    if create:
+
+        cart, created = Cart.objects.get_or_create(
+            customer_session=request.session.session_key
+        )
+
+        return cart
+
+    return Cart.objects.filter(
         customer_session=request.session.session_key
-    )
+    ).first()
 
-    return cart
+
+def update_cart_count(request, cart):
+    """
+    Keeps the header badge count in the session so the cart
+    context processor never has to query for it.
+    """
+    request.session["cart_count"] = (
+        cart.items.count() if cart else 0
+    )
 
 
 def add_to_cart(request, slug):
@@ -2240,7 +2228,7 @@ def add_to_cart(request, slug):
         slug=slug
     )
 
-    cart = get_cart(request)
+    cart = get_cart(request, create=True)
 
     cart_item, created = CartItem.objects.get_or_create(
         cart=cart,
@@ -2254,6 +2242,8 @@ def add_to_cart(request, slug):
         cart_item.quantity += 1
         cart_item.save()
 
+    update_cart_count(request, cart)
+
     messages.success(
         request,
         "Added to cart."
@@ -2271,9 +2261,12 @@ def cart_view(request):
 
     cart = get_cart(request)
 
-    items = cart.items.select_related(
-        "product"
-    )
+    if cart:
+        items = cart.items.select_related(
+            "product"
+        )
+    else:
+        items = CartItem.objects.none()
 
     total = sum(
         item.subtotal
@@ -2303,6 +2296,8 @@ def remove_from_cart(request, item_id):
 
     cart_item.delete()
 
+    update_cart_count(request, cart)
+
     messages.success(
         request,
         "Item removed from cart."
@@ -2350,6 +2345,8 @@ def decrease_cart_item(request, item_id):
 
         cart_item.delete()
 
+        update_cart_count(request, cart)
+
     return redirect(
         "cart"
     )
@@ -2357,7 +2354,10 @@ def clear_cart(request):
 
     cart = get_cart(request)
 
-    cart.items.all().delete()
+    if cart:
+        cart.items.all().delete()
+
+    update_cart_count(request, None)
 
     return redirect("cart")
 import requests
@@ -2369,7 +2369,6 @@ from django.utils import timezone
 
 from app.models import (
     Order,
-    PaymentHistory,
 )
 
 from app.services.wallet_service import (
@@ -2377,6 +2376,19 @@ from app.services.wallet_service import (
 )
 
 
+def _empty_paid_cart(request):
+    """
+    Empties the buyer's cart once their order is paid, on every path
+    (including when the webhook settled the order first).
+    """
+    cart = get_cart(request)
+
+    if cart:
+        cart.items.all().delete()
+
+    update_cart_count(request, None)
+
+
 def payment_success(request):
 
     reference = request.GET.get(
@@ -2392,22 +2404,23 @@ def payment_success(request):
 
         return redirect("cart")
 
-    headers = {
-
-        "Authorization":
-        f"Bearer {settings.PAYSTACK_SECRET_KEY}"
-
-    }
-
-    response = requests.get(
+    # Already settled by the webhook: no need to ask Paystack again
+    settled = Order.objects.filter(
+        paystack_reference=reference
+    ).exclude(
+        status="PENDING_PAYMENT"
+    ).first()
 
-        f"https://api.paystack.co/transaction/verify/{reference}",
+    if settled:
 
-        headers=headers,
+        _empty_paid_cart(request)
 
-    )
+        return redirect(
+            "verify_order",
+            token=settled.verification_token
+        )
 
-    res = response.json()
+    res = paystack.verify_transaction(reference)
 
     if not res["status"]:
 
@@ -2443,40 +2456,25 @@ def payment_success(request):
 
         return redirect("cart")
 
-    order = Order.objects.get(
-        id=metadata["order_id"]
-    )
+    try:
+        order, settled_now = settle_order(
+            reference,
+            data,
+            order_id=metadata["order_id"]
+        )
+    except SettlementError as e:
+        messages.error(request, str(e))
+        return redirect("cart")
+
+    _empty_paid_cart(request)
 
-    if order.status != "PENDING_PAYMENT":
+    if not settled_now:
 
         return redirect(
             "verify_order",
             token=order.verification_token
         )
 
-    order.status = "PAID"
-
-    order.paystack_reference = reference
-
-    order.save()
-
-    PaymentHistory.objects.get_or_create(
-        reference=reference,
-        defaults={
-            "user": order.seller,
-            "amount": order.amount,
-            "plan": "store_order",
-            "status": "success",
-            "paystack_response": data,
-        },
-    )
-
-    process_paid_order(order)
-
-    cart = get_cart(request)
-
-    cart.items.all().delete()
-
     verification_url = request.build_absolute_uri(
         reverse(
             "verify_order",
@@ -2563,6 +2561,15 @@ def checkout(request):
 
     cart = get_cart(request)
 
+    if not cart:
+
+        messages.error(
+            request,
+            "Your cart is empty."
+        )
+
+        return redirect("cart")
+
     items = cart.items.select_related(
         "product",
         "product__store",
@@ -2642,14 +2649,6 @@ def checkout(request):
 
         order.save()
 
-        headers = {
-
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-
-            "Content-Type": "application/json",
-
-        }
-
         payload = {
 
             # Paystack requires an email.
@@ -2674,13 +2673,7 @@ def checkout(request):
 
         }
 
-        response = requests.post(
-            "https://api.paystack.co/transaction/initialize",
-            json=payload,
-            headers=headers,
-        )
-
-        res = response.json()
+        res = paystack.initialize_transaction(**payload)
 
         if not res["status"]:
 
@@ -2720,7 +2713,6 @@ from django.utils import timezone
 
 from app.models import (
     Order,
-    PaymentHistory,
 )
 
 
@@ -2737,17 +2729,23 @@ def order_payment_success(request):
 
         return redirect("cart")
 
-    headers = {
-        "Authorization":
-        f"Bearer {settings.PAYSTACK_SECRET_KEY}"
-    }
+    # Already settled by the webhook: no need to ask Paystack again
+    settled = Order.objects.filter(
+        paystack_reference=reference
+    ).exclude(
+        status="PENDING_PAYMENT"
+    ).first()
 
-    response = requests.get(
-        f"https://api.paystack.co/transaction/verify/{reference}",
-        headers=headers
-    )
+    if settled:
 
-    res = response.json()
+        _empty_paid_cart(request)
+
+        return redirect(
+            "verify_order",
+            token=settled.verification_token
+        )
+
+    res = paystack.verify_transaction(reference)
 
     if not res.get("status"):
 
@@ -2783,44 +2781,30 @@ def order_payment_success(request):
 
         return redirect("cart")
 
-    order = get_object_or_404(
+    get_object_or_404(
         Order,
         id=metadata["order_id"]
     )
 
-    if order.status != "PENDING_PAYMENT":
+    try:
+        order, settled_now = settle_order(
+            reference,
+            data,
+            order_id=metadata["order_id"]
+        )
+    except SettlementError as e:
+        messages.error(request, str(e))
+        return redirect("cart")
+
+    _empty_paid_cart(request)
+
+    if not settled_now:
 
         return redirect(
             "verify_order",
             token=order.verification_token
         )
 
-    order.status = "PAID"
-
-    order.paystack_reference = reference
-
-    order.save()
-
-    PaymentHistory.objects.create(
-
-        user=order.seller,
-
-        reference=reference,
-
-        amount=order.amount,
-
-        plan="store_order",
-
-        status="success",
-
-        paystack_response=data,
-
-    )
-
-    cart = get_cart(request)
-
-    cart.items.all().delete()
-
     verification_link = request.build_absolute_uri(
 
         reverse(
@@ -3329,17 +3313,8 @@ def bank_account(request):
         user=request.user
     ).first()
 
-    # Fetch banks once
-    banks = requests.get(
-
-        "https://api.paystack.co/bank",
-
-        headers={
-            "Authorization":
-            f"Bearer {settings.PAYSTACK_SECRET_KEY}"
-        }
-
-    ).json()["data"]
+    # Local copy, refreshed by refresh_paystack_banks
+    banks = get_banks()
 
     if request.method == "POST":
 
@@ -3348,37 +3323,14 @@ def bank_account(request):
         account_number = request.POST["account_number"]
 
         # Get bank name from selected bank code
-        bank_name = next(
-
-            (
-                bank["name"]
-                for bank in banks
-                if bank["code"] == bank_code
-            ),
-
-            ""
-
-        )
-
-        # Verify account
-        verify = requests.get(
-
-            "https://api.paystack.co/bank/resolve",
-
-            headers={
-                "Authorization":
-                f"Bearer {settings.PAYSTACK_SECRET_KEY}"
-            },
-
-            params={
-                "account_number": account_number,
-                "bank_code": bank_code,
-            }
+        selected_bank_name = bank_name(bank_code)
 
+        # Verify account (cached per account number and bank)
+        verify = resolve_account(
+            account_number,
+            bank_code
         )
 
-        verify = verify.json()
-
         if not verify["status"]:
 
             messages.error(
@@ -3393,36 +3345,20 @@ def bank_account(request):
         account_name = verify["data"]["account_name"]
 
         # Create recipient
-        recipient = requests.post(
-
-            "https://api.paystack.co/transferrecipient",
+        recipient = paystack.create_transfer_recipient(
 
-            headers={
-                "Authorization":
-                f"Bearer {settings.PAYSTACK_SECRET_KEY}",
+            type="nuban",
 
-                "Content-Type":
-                "application/json",
-            },
-
-            json={
-
-                "type": "nuban",
-
-                "name": account_name,
-
-                "account_number": account_number,
+            name=account_name,
 
-                "bank_code": bank_code,
+            account_number=account_number,
 
-                "currency": "NGN",
+            bank_code=bank_code,
 
-            }
+            currency="NGN",
 
         )
 
-        recipient = recipient.json()
-
         if not recipient["status"]:
 
             messages.error(
@@ -3442,7 +3378,7 @@ def bank_account(request):
 
                 "bank_code": bank_code,
 
-                "bank_name": bank_name,
+                "bank_name": selected_bank_name,
 
                 "account_number": account_number,
 
@@ -3597,21 +3533,23 @@ def dashboard(request):
         user=request.user
     )
 
-    stores = Store.objects.filter(
-        owner=request.user
-    ).order_by("brand_name")
+    registry = get_store_registry(request)
+
+    stores = sorted(
+        registry.stores,
+        key=lambda s: s.brand_name.lower()
+    )
 
     # Active store
     store_id = request.GET.get("store")
 
     if store_id:
-        active_store = get_object_or_404(
-            Store,
-            id=store_id,
-            owner=request.user
-        )
+        active_store = registry.get(store_id)
+
+        if not active_store:
+            raise Http404("Store not found.")
     else:
-        active_store = stores.first()
+        active_store = stores[0] if stores else None
 
     # Orders for selected store only
     if active_store:
@@ -3685,6 +3623,16 @@ def dashboard(request):
         "pending_orders": pending_orders,
         "recent_orders": recent_orders,
 
+        # Buffered counters, including increments not flushed yet
+        "store_views": (
+            counters.get_total(active_store, "total_views")
+            if active_store else 0
+        ),
+        "store_orders": (
+            counters.get_total(active_store, "total_orders")
+            if active_store else 0
+        ),
+
         # Subscription
         "subscription": subscription,
         "days_left": days_left,
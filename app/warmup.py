@@ -0,0 +1,28 @@
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """
+    Loads the per-worker lookup tables (custom domains, fuzzy search
+    indexes, suggestion trie) when the worker starts, so no visitor's
+    request waits for them. Called by every WSGI/ASGI entry point.
+
+    A table that can't be loaded (e.g. the database isn't reachable yet)
+    is logged and left to the first request that needs it.
+    """
+    from app.services.domain_index import load_index
+    from app.services.search_index import load_indexes
+    from app.services.suggest import build
+
+    for name, load in (
+        ("domain index", load_index),
+        ("search indexes", load_indexes),
+        ("suggestion trie", build),
+    ):
+        try:
+            load()
+        except Exception:
+            logger.exception("Could not load the %s at startup", name)
@@ -26,5 +26,11 @@ try:
     from django.core.wsgi import get_wsgi_application
     application = get_wsgi_application()
 
+    # -------------------------------
+    # 4️⃣ Load the in-process indexes (see app.warmup)
+    # -------------------------------
+    from app.warmup import warm_up
+    warm_up()
+
 except Exception:
     raise   # just re-raise the error (no file writing)
@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_asgi_application()
+
+# Load the in-process indexes before the first request (see app.warmup)
+from app.warmup import warm_up
+warm_up()
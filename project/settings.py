@@ -19,6 +19,14 @@ ALLOWED_HOSTS = [
     ".waapfolio.com",
 ]
 
+# Verified custom domains served by StoreSubdomainMiddleware,
+# e.g. CUSTOM_DOMAIN_HOSTS="shopwithada.com,.shopwithada.com"
+ALLOWED_HOSTS += [
+    host.strip()
+    for host in os.getenv('CUSTOM_DOMAIN_HOSTS', '').split(',')
+    if host.strip()
+]
+
 # CSRF and cookie settings
 if LOCAL:
     SESSION_COOKIE_SECURE = False
@@ -148,6 +156,19 @@ DATABASES = {
     }
 }
 
+# Cache (point CACHE_BACKEND/CACHE_LOCATION at a shared backend in production
+# so every worker sees the same entries and invalidations; buffered store
+# counters also live there until flush_counters writes them)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'waapfolio'),
+    }
+}
+# False while each process has its own cache (the default): store counters are
+# then written straight to the database, and entitlements expire quickly
+CACHE_IS_SHARED = not CACHES['default']['BACKEND'].endswith(('LocMemCache', 'DummyCache'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -157,11 +178,29 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 IMGBB_API_KEY = os.getenv('IMGBB_API_KEY')
+# Without ImgBB, product images stay in local (content-addressed) media storage
+IMGBB_ENABLED = os.getenv('IMGBB_ENABLED', 'True') == 'True' and bool(IMGBB_API_KEY)
+# False = upload product images during the request (concurrently) instead of
+# leaving them to the process_uploads command
+MEDIA_UPLOADS_ASYNC = os.getenv('MEDIA_UPLOADS_ASYNC', 'True') == 'True'
+IMGBB_MAX_WORKERS = int(os.getenv('IMGBB_MAX_WORKERS', 4))
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 # Upload limits
 DATA_UPLOAD_MAX_MEMORY_SIZE = 1048576000  # ~1 GB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 1048576000  # ~1 GB
+# Files above this are spooled to a temp file instead of held in memory
+# (uploads are streamed from there, see app.utils.MultipartFileStream)
+FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5 MB
+# Resumable video uploads are assembled here (not under MEDIA_ROOT, so
+# partial files are never served) before going to YouTube
+VIDEO_UPLOAD_DIR = os.getenv('VIDEO_UPLOAD_DIR', str(BASE_DIR / 'video_uploads'))
+VIDEO_UPLOAD_MAX_SIZE = DATA_UPLOAD_MAX_MEMORY_SIZE
+# Bytes per request to YouTube (a multiple of 256 KB)
+YOUTUBE_CHUNK_SIZE = int(os.getenv('YOUTUBE_CHUNK_SIZE', 8 * 1024 * 1024))
+# YouTube Data API units per day (resets at midnight Pacific) and the
+# cost of one videos.insert
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', 10000))
+YOUTUBE_UPLOAD_COST = int(os.getenv('YOUTUBE_UPLOAD_COST', 1600))
 
 # Email
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -194,4 +233,11 @@ LOGIN_REDIRECT_URL = 'home'
 MEDIA_URL = 'https://waapfolio.com/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# New uploads are stored under the hash of their contents (deduplicated,
+# immutable names), see app/storage.py
+STORAGES = {
+    "default": {"BACKEND": "app.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
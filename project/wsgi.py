@@ -10,3 +10,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
+
+# Load the in-process indexes before the first request (see app.warmup)
+from app.warmup import warm_up
+warm_up()